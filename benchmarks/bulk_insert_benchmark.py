@@ -0,0 +1,79 @@
+"""
+Import cost of expense-like rows into a SQLite file: DatabaseManager.create called per row, as the statement importer does,
+against create_many and upsert_many over a DataFrame. Run from the repository root with `python -m benchmarks.bulk_insert_benchmark`.
+"""
+from sqlalchemy import create_engine, Column, Integer, String, Float
+from sqlalchemy.ext.declarative import declarative_base
+from src.utils.managers.database_manager import DatabaseManager
+from datetime import datetime, timedelta
+import pandas as pd
+import numpy as np
+import tempfile
+import logging
+import time
+import os
+
+ROWS = 10000
+
+# The per-row path commits every row, a sample is enough to measure it
+LOOP_ROWS = 500
+
+Base = declarative_base()
+
+class Expense(Base):
+    __tablename__ = 'expense'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    reference = Column(String, unique=True)
+    date = Column(String)
+    description = Column(String)
+    category = Column(String)
+    debit = Column(Float)
+    credit = Column(Float)
+    total = Column(Float)
+    account_id = Column(String)
+    updated = Column(String)
+    created = Column(String)
+
+def make_expenses(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    debit = rng.uniform(0, 500, rows).round(2)
+    credit = np.zeros(rows)
+    return pd.DataFrame({
+        'reference': [f'REF{i:08d}' for i in range(rows)],
+        'date': [datetime(2024, 1, 1) + timedelta(minutes=i) for i in range(rows)],
+        'description': [f'Purchase {i}' for i in range(rows)],
+        'category': rng.choice(['Food', 'Transportation', 'Recreation'], rows),
+        'debit': debit,
+        'credit': credit,
+        'total': credit - debit,
+        'account_id': 'CR000000000000000000',
+    })
+
+def main():
+    # The manager logs every call, which would dominate the per-row path
+    logging.getLogger('rich').setLevel(logging.WARNING)
+    expenses = make_expenses(ROWS)
+
+    with tempfile.TemporaryDirectory() as directory:
+        db = DatabaseManager(Base, create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}"))
+
+        start = time.perf_counter()
+        for expense in expenses.head(LOOP_ROWS).to_dict('records'):
+            db.create('expense', expense)
+        loop = (time.perf_counter() - start) / LOOP_ROWS * ROWS
+
+        start = time.perf_counter()
+        db.create_many('expense', expenses.iloc[LOOP_ROWS:])
+        bulk = time.perf_counter() - start
+
+        start = time.perf_counter()
+        db.upsert_many('expense', expenses, conflict=['reference'])
+        upsert = time.perf_counter() - start
+
+    print(f"{'method':<30}{f'{ROWS} rows (s)':>16}{'speedup':>10}")
+    print(f"{'create per row (projected)':<30}{loop:>16.2f}{1:>9.1f}x")
+    print(f"{'create_many':<30}{bulk * ROWS / (ROWS - LOOP_ROWS):>16.3f}{loop / bulk * (ROWS - LOOP_ROWS) / ROWS:>9.1f}x")
+    print(f"{'upsert_many':<30}{upsert:>16.3f}{loop / upsert:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Per-item serialization cost of connector results: the previous .dict() loop plus Flask's jsonify
+against src.utils.encoder. Run from the repository root with `python -m benchmarks.encoder_benchmark`.
+"""
+from ib_insync import Stock, MarketOrder, Trade, OrderStatus, Fill, Execution, CommissionReport, BarData, PortfolioItem
+from flask import Flask, jsonify
+from datetime import datetime, date, timedelta, timezone
+from src.utils.encoder import encode
+import time
+
+ITEMS = 2000
+ROUNDS = 5
+
+def make_trades() -> list:
+    trades = []
+    for i in range(ITEMS):
+        contract = Stock(f'SYM{i}', 'SMART', 'USD', conId=1000 + i)
+        execution = Execution(execId=f'0001.{i}', time=datetime.now(timezone.utc), shares=10, price=101.5)
+        fill = Fill(contract, execution, CommissionReport(execId=f'0001.{i}', commission=1.0), datetime.now(timezone.utc))
+        trades.append(Trade(contract=contract, order=MarketOrder('BUY', 10, orderId=i), orderStatus=OrderStatus(orderId=i, status='Filled'), fills=[fill]))
+    return trades
+
+def make_portfolio() -> list:
+    return [PortfolioItem(Stock(f'SYM{i}', 'SMART', 'USD', conId=1000 + i), 10, 101.5, 1015.0, 100.0, 15.0, 0.0, 'DU123') for i in range(ITEMS)]
+
+def make_bars() -> list:
+    return [BarData(date=date(2020, 1, 1) + timedelta(days=i), open=1.0, high=2.0, low=0.5, close=1.5, volume=1000, average=1.2, barCount=10) for i in range(ITEMS)]
+
+def as_dict(item):
+    # PortfolioItem is a named tuple without .dict(), the old loop needed _asdict() for it
+    return item.dict() if hasattr(item, 'dict') else item._asdict()
+
+def measure(func) -> float:
+    best = float('inf')
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best / ITEMS * 1e6
+
+def main():
+    app = Flask(__name__)
+    cases = {'Trade': make_trades(), 'PortfolioItem': make_portfolio(), 'BarData': make_bars()}
+    print(f"{'type':<15}{'dict + jsonify (us/item)':>28}{'encoder (us/item)':>22}{'speedup':>10}")
+    with app.app_context():
+        for name, items in cases.items():
+            before = measure(lambda: jsonify([as_dict(item) for item in items]).get_data())
+            after = measure(lambda: encode(items))
+            print(f"{name:<15}{before:>28.2f}{after:>22.2f}{before / after:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Throughput of a SQLite file under concurrent request threads, as gunicorn threads hit the SQLite connector:
+reader threads query expenses while writer threads insert them, against a default engine and the tuned sqlite_engines pair.
+Run from the repository root with `python -m benchmarks.sqlite_concurrency_benchmark`.
+"""
+from sqlalchemy import create_engine
+from src.utils.managers.database_manager import DatabaseManager, sqlite_engines
+from benchmarks.bulk_insert_benchmark import Base, make_expenses
+import threading
+import tempfile
+import logging
+import time
+import os
+
+READERS = 8
+WRITERS = 2
+SECONDS = 5
+
+# Rows per write transaction, as the journal flushes and statement imports commit them
+WRITE_BATCH = 200
+
+# Rows present before the threads start, so reads have something to scan
+SEED_ROWS = 20000
+
+def run(db: DatabaseManager, expenses: list) -> dict:
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    latencies = []
+    lock = threading.Lock()
+    stop = time.perf_counter() + SECONDS
+
+    def reader(index: int):
+        categories = ['Food', 'Transportation', 'Recreation']
+        i = index
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            try:
+                db.read('expense', {'category': categories[i % 3], 'date': {'gte': '20240105000000'}, '_limit': 50})
+                with lock:
+                    counts['reads'] += 1
+                    latencies.append(time.perf_counter() - start)
+            except Exception:
+                with lock:
+                    counts['errors'] += 1
+            i += 1
+
+    def writer(index: int):
+        i = index
+        while time.perf_counter() < stop:
+            batch = [dict(expense, reference=f'W{index}-{i}-{j}') for j, expense in enumerate(expenses[:WRITE_BATCH])]
+            try:
+                db.create_many('expense', batch)
+                with lock:
+                    counts['writes'] += len(batch)
+            except Exception:
+                with lock:
+                    counts['errors'] += 1
+            i += WRITERS
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(READERS)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(WRITERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    counts['p99'] = latencies[int(len(latencies) * 0.99)] * 1000 if latencies else float('nan')
+    return counts
+
+def main():
+    # The manager logs every call, which would dominate the measured path
+    logging.getLogger('rich').setLevel(logging.WARNING)
+    seed = make_expenses(SEED_ROWS)
+    expenses = seed.head(1000).drop(columns='reference').to_dict('records')
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ('default', 'tuned'):
+            path = os.path.join(directory, f'{name}.db')
+            if name == 'default':
+                db = DatabaseManager(Base, create_engine(f'sqlite:///{path}'))
+            else:
+                writer, reader = sqlite_engines(path)
+                db = DatabaseManager(Base, writer, read_engine=reader)
+            db.create_many('expense', seed)
+            db.ensure_indexes({'expense': ['date', 'category']})
+            results[name] = run(db, expenses)
+            db.engine.dispose()
+            db.read_engine.dispose()
+
+    print(f"{READERS} readers, {WRITERS} writers, {SECONDS}s")
+    print(f"{'engine':<10}{'reads/s':>10}{'rows written/s':>16}{'errors':>8}{'read p99 (ms)':>15}")
+    for name, counts in results.items():
+        print(f"{name:<10}{counts['reads'] / SECONDS:>10.0f}{counts['writes'] / SECONDS:>16.0f}{counts['errors']:>8}{counts['p99']:>15.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -11,11 +11,18 @@ import os
 load_dotenv()
 public_routes = ['docs', 'index', 'token', 'oauth.login', 'oauth.create', 'yfinance.get_scroller_data']
 
+# EventSource clients cannot set headers, so only the stream also takes the token as ?jwt=.
+# Everywhere else it stays out of URLs, which end up in access logs and proxies
+query_token_routes = ['market.stream_route']
+
 def jwt_required_except_login():
     logger.info(f'\nRequest endpoint: {request.endpoint}')
     if request.endpoint not in public_routes:
         try:
-            verify_jwt_in_request()
+            if request.endpoint in query_token_routes:
+                verify_jwt_in_request(locations=['headers', 'query_string'])
+            else:
+                verify_jwt_in_request()
         except exceptions.JWTExtendedException as e:
             return jsonify({"msg": str(e)}), 401
  
@@ -33,6 +40,7 @@ def start_api():
     
     # Add JWT configuration
     app.config['JWT_SECRET_KEY'] = jwt_secret_key
+    app.config['JWT_TOKEN_LOCATION'] = ['headers']
 
     # Default expiration time (1 hour)
     DEFAULT_TOKEN_EXPIRES = timedelta(hours=1)
@@ -9,4 +9,38 @@ if [ -f .env ]; then
     done < .env
 fi
 
-gunicorn --bind 0.0.0.0:${PORT} --timeout 180 run:app
\ No newline at end of file
+# Several workers share one IB session through the broker process, which owns the IB connection
+WORKERS=${GUNICORN_WORKERS:-1}
+if [ "$WORKERS" -gt 1 ]; then
+    export IBKR_BROKER_SOCKET=${IBKR_BROKER_SOCKET:-/tmp/ibkr-broker.sock}
+    rm -f "$IBKR_BROKER_SOCKET"
+    python -m src.utils.connectors.broker &
+    while [ ! -S "$IBKR_BROKER_SOCKET" ]; do
+        sleep 0.5
+    done
+fi
+
+# Extra threads only help with IBKR_ASYNC=true or the broker, the sync IB client is bound to one thread
+THREADS=${GUNICORN_THREADS:-1}
+
+# Every open /market/stream client holds a thread for as long as it stays, and a sync worker would be taken
+# by the first one and killed at the timeout. Streaming runs threaded workers, with the IB client on its own loop
+if [ "${MARKET_STREAMING:-false}" = "true" ]; then
+    if [ "$THREADS" -lt 8 ]; then
+        THREADS=8
+    fi
+    if [ -z "$IBKR_BROKER_SOCKET" ]; then
+        export IBKR_ASYNC=true
+    fi
+fi
+
+# gthread serves requests on pool threads, which only works when IB is not run from the request thread.
+# Otherwise the sync worker keeps every request on the thread that owns the IB socket and its event loop
+if [ "${IBKR_ASYNC:-false}" = "true" ] || [ -n "$IBKR_BROKER_SOCKET" ]; then
+    WORKER_CLASS=gthread
+else
+    WORKER_CLASS=sync
+    THREADS=1
+fi
+
+gunicorn --bind 0.0.0.0:${PORT} --timeout 180 --workers ${WORKERS} --worker-class ${WORKER_CLASS} --threads ${THREADS} run:app
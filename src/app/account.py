@@ -1,7 +1,9 @@
-from flask import Blueprint
-from src.components.account import summary, positions, portfolio, pnl, pnl_single
+from flask import Blueprint, request
+from src.components.account import summary, positions, portfolio, pnl, pnl_single, risk
+from src.utils.response import finalize_response
 
 bp = Blueprint('account', __name__) 
+bp.after_request(finalize_response)
 
 @bp.route('/summary', methods=['GET'])
 def summary_route():
@@ -19,6 +21,13 @@ def portfolio_route():
 def pnl_route():
     return pnl()
 
+@bp.route('/risk', methods=['GET'])
+def risk_route():
+    benchmark = request.args.get('benchmark', 'SPY')
+    period = request.args.get('period', '1 Y')
+    confidence = request.args.get('confidence', 0.95, type=float)
+    return risk(benchmark, period, confidence)
+
 @bp.route('/pnl-single', methods=['GET'])
 def pnl_single_route():
     return pnl_single()
\ No newline at end of file
@@ -1,17 +1,45 @@
 from flask import Blueprint, request
-from src.components.market import historical_stock_price, latest_stock_data
+from src.components.market import historical_stock_price, historical_stock_batch, latest_stock_data, stock_indicators, stream_stock_data
+from src.utils.response import finalize_response, query
 
 bp = Blueprint('market', __name__) 
+bp.after_request(finalize_response)
 
 @bp.route('/latest/stock', methods=['POST'])
+@query
 def latest_price_route():
     payload = request.get_json(force=True)
     symbol = payload.get('symbol', None)
     return latest_stock_data(symbol)
     
 @bp.route('/historical/stock', methods=['POST'])
+@query
 def historical_price_route():
     payload = request.get_json(force=True)
     symbol = payload.get('symbol', None)
-    period = payload.get('period', None)
-    return historical_stock_price(symbol, period)
\ No newline at end of file
+    period = payload.get('period', '1 Y')
+    format = payload.get('format', 'json')
+    return historical_stock_price(symbol, period, format)
+
+@bp.route('/historical/batch', methods=['POST'])
+@query
+def historical_batch_route():
+    payload = request.get_json(force=True)
+    symbols = payload.get('symbols', [])
+    period = payload.get('period', '1 Y')
+    return historical_stock_batch(symbols, period)
+
+@bp.route('/indicators', methods=['POST'])
+@query
+def indicators_route():
+    payload = request.get_json(force=True)
+    symbols = payload.get('symbols', [])
+    indicators = payload.get('indicators', [])
+    period = payload.get('period', '1 Y')
+    return stock_indicators(symbols, indicators, period)
+
+@bp.route('/stream', methods=['GET'])
+def stream_route():
+    symbols = request.args.get('symbols', '')
+    interval = request.args.get('interval', 1.0, type=float)
+    return stream_stock_data([symbol for symbol in symbols.split(',') if symbol], interval)
\ No newline at end of file
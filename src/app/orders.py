@@ -1,18 +1,28 @@
-from flask import Blueprint
-from src.components.orders import open_orders, completed_orders, place_order
+from flask import Blueprint, request
+from src.components.orders import open_orders, completed_orders, place_order, place_batch
 from src.components.orders import order_status
 from src.components.orders import cancel_order
 from src.components.orders import exec_details
 from src.components.orders import close_all_positions
+from src.utils.response import finalize_response
 bp = Blueprint('orders', __name__)
+bp.after_request(finalize_response)
 
 @bp.route('/place-order', methods=['POST'])
 def place_order_route():
     return place_order()
 
+@bp.route('/place-batch', methods=['POST'])
+def place_batch_route():
+    payload = request.get_json(force=True)
+    orders = payload.get('orders', [])
+    timeout = payload.get('timeout', None)
+    return place_batch(orders, timeout)
+
 @bp.route('/order-status', methods=['GET'])
 def order_status_route():
-    return order_status()
+    orderId = request.args.get('orderId', None, type=int)
+    return order_status(orderId)
 
 @bp.route('/cancel-order', methods=['POST'])
 def cancel_order_route():
@@ -24,11 +34,20 @@ def open_orders_route():
 
 @bp.route('/completed-orders', methods=['GET'])
 def completed_orders_route():
-    return completed_orders()
+    # Time bounds are UTC timestamps formatted as YYYYMMDDHHMMSS
+    start = request.args.get('start', None)
+    end = request.args.get('end', None)
+    # Cursor from the previous response, only what changed after it is returned
+    since = request.args.get('since', None, type=int)
+    return completed_orders(start, end, since)
 
 @bp.route('/exec-details', methods=['GET'])
 def exec_details_route():
-    return exec_details()
+    orderId = request.args.get('orderId', None, type=int)
+    symbol = request.args.get('symbol', None)
+    start = request.args.get('start', None)
+    end = request.args.get('end', None)
+    return exec_details(orderId, symbol, start, end)
 
 @bp.route('/close-all-positions', methods=['POST'])
 def close_all_positions_route():
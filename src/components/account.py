@@ -1,34 +1,78 @@
-from ib_insync import Contract
+from ib_insync import Contract, Stock
+from flask import Response
 from src.utils.exception import handle_exception
+from src.utils.encoder import json_response
 from src.utils.logger import logger
-from src.utils.connectors.tws import TWSConnector
+from src.utils.connectors.broker import connector
+from src.utils.managers.risk_manager import RiskManager
 
 logger.announcement("Initializing Account Service", 'info')
 logger.announcement("Account Service initialized", 'success')
 
-tws = TWSConnector()
+tws = connector()
+risk_engine = RiskManager(tws.contract_details)
+
+def _snapshot_response(section: str):
+    snapshot = tws.account_snapshot(section)
+    response = Response(snapshot['body'], mimetype='application/json')
+    response.set_etag(snapshot['etag'])
+    return response
 
 @handle_exception
 def summary():
     logger.info(f"Fetching account summary information")
-    return tws.account_summary()
+    return _snapshot_response('summary')
 
 @handle_exception
 def positions():
     logger.info(f"Fetching account positions information")
-    return tws.positions()
+    return _snapshot_response('positions')
 
 @handle_exception
 def portfolio():
     logger.info(f"Fetching account portfolio information")
-    return tws.portfolio()
+    return _snapshot_response('portfolio')
 
 @handle_exception
 def pnl():
     logger.info(f"Fetching account PNL information")
-    return tws.pnl()
+    return _snapshot_response('pnl')
 
 @handle_exception
 def pnl_single(contract: Contract):
     logger.info(f"Fetching account PNL for {contract} information")
-    return tws.pnl_single(contract)
\ No newline at end of file
+    return json_response(tws.pnl_single(contract))
+
+@handle_exception
+def risk(benchmark: str = 'SPY', period: str = '1 Y', confidence: float = 0.95):
+    logger.info(f"Computing portfolio risk against {benchmark}")
+    if not 0 < confidence < 1:
+        raise Exception("Confidence must be between 0 and 1.")
+    # Risk is measured on daily stock bars, other holdings are listed as excluded
+    holdings = [item for item in tws.portfolio() if item.position]
+    excluded = [item.contract.localSymbol or item.contract.symbol for item in holdings if item.contract.secType != 'STK']
+    holdings = [item for item in holdings if item.contract.secType == 'STK']
+    if not holdings:
+        raise Exception("No stock positions to compute risk for.")
+
+    contracts = {item.contract.symbol: item.contract for item in holdings}
+    contracts.setdefault(benchmark, Stock(benchmark, 'SMART', 'USD'))
+    columns = {}
+    errors = {}
+    for result in tws.historical_data_batch(list(contracts.values()), period, columnar=True):
+        if 'error' in result:
+            errors[result['symbol']] = result['error']
+        elif not len(result['data']['date']):
+            errors[result['symbol']] = "No historical data available."
+        else:
+            columns[result['symbol']] = result['data']
+    if benchmark not in columns:
+        raise Exception(f"No historical data for benchmark {benchmark}: {errors.get(benchmark)}")
+
+    holdings = [item for item in holdings if item.contract.symbol in columns]
+    if not holdings:
+        raise Exception(f"No historical data for any stock position: {errors}")
+    risk_data = dict(risk_engine.evaluate(holdings, columns, benchmark, confidence))
+    risk_data['excluded'] = excluded
+    risk_data['errors'] = errors
+    return json_response(risk_data)
@@ -1,21 +1,114 @@
 from ib_insync import *
+from flask import Response, stream_with_context
 from src.utils.exception import handle_exception
+from src.utils.encoder import encode, json_response, ndjson_response
+from src.utils.columnar import columnar_response, FORMATS
 from src.utils.logger import logger
-from src.utils.connectors.tws import TWSConnector
+from src.utils.connectors.broker import connector, BrokerClient
+from src.utils.managers.quote_table_manager import QuoteTableManager
+from src.utils.managers.indicator_manager import IndicatorManager
+import os
 
 logger.announcement("Initializing Market Data Service", 'info')
 logger.announcement("Market Data Service initialized", 'success')
 
-tws = TWSConnector()
+tws = connector()
+quotes = QuoteTableManager()
+
+# The quote table is only kept current when the broker or the async loop thread runs IB between requests.
+# A sync connector only processes ticks inside a request, so there it is asked directly
+_LIVE_QUOTES = isinstance(tws, BrokerClient) or tws.async_mode
+technicals = IndicatorManager()
+
+# Server-sent events hold a worker thread per client, run.sh only sets up workers for that when this is on
+_STREAMING = os.getenv('MARKET_STREAMING', 'false').lower() == 'true'
 
 @handle_exception
 def latest_stock_data(symbol: str):
     logger.info(f"Fetching latest price for {symbol}")
+    quote = quotes.read(symbol) if _LIVE_QUOTES else None
+    if quote is not None:
+        return json_response(quote)
     contract = Stock(symbol, 'SMART', 'USD')
-    return tws.current_data(contract)
+    return json_response(tws.current_data(contract))
 
 @handle_exception
-def historical_stock_price(symbol: str, period: str = '1 Y'):
-    logger.info(f"Fetching historical data for {symbol}")
+def historical_stock_price(symbol: str, period: str = '1 Y', format: str = 'json'):
+    logger.info(f"Fetching historical data for {symbol} as {format}")
+    if format != 'json' and format not in FORMATS:
+        raise Exception(f"Unsupported format '{format}', expected one of json, {', '.join(FORMATS)}.")
     contract = Stock(symbol, 'SMART', 'USD')
-    return tws.historical_data(contract, period)
\ No newline at end of file
+    if format == 'json':
+        return json_response(tws.historical_data(contract, period))
+    return columnar_response(tws.historical_data(contract, period, columnar=True), format)
+
+@handle_exception
+def historical_stock_batch(symbols: list, period: str = '1 Y'):
+    logger.info(f"Fetching historical data for {len(symbols)} symbols")
+    if not symbols:
+        raise Exception("At least one symbol must be provided.")
+    contracts = [Stock(symbol, 'SMART', 'USD') for symbol in dict.fromkeys(symbols)]
+    # Called here so a failure to start is the usual error response, not a 200 cut short
+    results = tws.historical_data_batch(contracts, period)
+
+    def lines():
+        sent = set()
+        try:
+            for result in results:
+                sent.add(result['symbol'])
+                yield result
+        except Exception as e:
+            # The broker connection can still fail once the 200 is out, the rest is reported per symbol
+            logger.error(f"Error streaming historical data: {str(e)}")
+            for contract in contracts:
+                if contract.symbol not in sent:
+                    yield {'symbol': contract.symbol, 'error': str(e)}
+
+    # Every symbol is sent as soon as it arrives
+    return ndjson_response(lines(), flush=True)
+
+@handle_exception
+def stock_indicators(symbols: list, indicators: list, period: str = '1 Y'):
+    logger.info(f"Computing {indicators} for {len(symbols)} symbols")
+    if not symbols:
+        raise Exception("At least one symbol must be provided.")
+    if not indicators:
+        raise Exception("At least one indicator must be provided.")
+    # Reject bad indicators before any bars are fetched
+    for indicator in indicators:
+        technicals.parse(indicator)
+
+    contracts = [Stock(symbol, 'SMART', 'USD') for symbol in dict.fromkeys(symbols)]
+    columns = {}
+    errors = {}
+    for result in tws.historical_data_batch(contracts, period, columnar=True):
+        if 'error' in result:
+            errors[result['symbol']] = result['error']
+        elif not len(result['data']['date']):
+            errors[result['symbol']] = "No historical data available."
+        else:
+            columns[result['symbol']] = result['data']
+
+    indicator_data = technicals.compute(columns, indicators, period)
+    indicator_data['errors'] = errors
+    return json_response(indicator_data)
+
+@handle_exception
+def stream_stock_data(symbols: list, interval: float = 1.0):
+    logger.info(f"Streaming latest prices for {symbols}")
+    if not _STREAMING:
+        raise Exception("Streaming is disabled, set MARKET_STREAMING=true so run.sh starts threaded workers for it.")
+    if not symbols:
+        raise Exception("At least one symbol must be provided.")
+    contracts = [Stock(symbol, 'SMART', 'USD') for symbol in dict.fromkeys(symbols)]
+    client_id = tws.open_stream(contracts)
+
+    def events():
+        for quotes in tws.stream_updates(client_id, interval):
+            if quotes is None:
+                yield b': keep-alive\n\n'
+                continue
+            yield b'data: ' + encode(quotes) + b'\n\n'
+
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers=headers)
\ No newline at end of file
@@ -1,44 +1,73 @@
-from ib_insync import Contract, Order
-from src.utils.connectors.tws import TWSConnector
+from ib_insync import Contract, Order, Stock
+from src.utils.connectors.broker import connector
+from src.utils.connectors.tws import OrdersPending
 from src.utils.exception import handle_exception
+from src.utils.encoder import json_response
 from src.utils.logger import logger
+import functools
 
 logger.announcement("Initializing Orders Service", 'info')
 logger.announcement("Orders Service initialized", 'success')
 
-tws = TWSConnector()
+tws = connector()
+
+def accepted_when_pending(func):
+    """Answers 202 instead of an error when IBKR did not answer in time on orders that may already be placed."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except OrdersPending as e:
+            logger.warning(f"Orders pending in {func.__name__}: {str(e)}")
+            return json_response({'pending': True, 'message': f"{str(e)}. Check the open orders before retrying."}, status=202)
+    return wrapper
 
 @handle_exception
+@accepted_when_pending
 def place_order(contract: Contract, order: Order):
     logger.info(f"Placing order: {order}")
-    return tws.place_order(contract, order)
+    return json_response(tws.place_order(contract, order))
+
+@handle_exception
+@accepted_when_pending
+def place_batch(orders: list, timeout: float = None):
+    logger.info(f"Placing a batch of {len(orders)} orders")
+    if not orders:
+        raise Exception("At least one order must be provided.")
+    pairs = [(Contract.create(**spec['contract']), Order(**spec['order'])) for spec in orders]
+    if timeout is None:
+        return json_response(tws.place_orders(pairs))
+    return json_response(tws.place_orders(pairs, timeout))
 
 @handle_exception
 def order_status(orderId: int):
     logger.info(f"Fetching account order status information")
-    return tws.order_status(orderId)
+    return json_response(tws.order_status(orderId))
 
 @handle_exception
+@accepted_when_pending
 def cancel_order(orderId: int):
     logger.info(f"Cancelling order: {orderId}")
-    return tws.cancel_order(orderId)
+    return json_response(tws.cancel_order(orderId))
 
 @handle_exception
-def exec_details(orderId: int, contract: Contract):
+def exec_details(orderId: int = None, symbol: str = None, start: str = None, end: str = None):
     logger.info(f"Fetching account exec details information")
-    return tws.exec_details(orderId, contract)
+    contract = Stock(symbol, 'SMART', 'USD') if symbol else None
+    return json_response(tws.exec_details(orderId, contract, start, end))
 
 @handle_exception
-def completed_orders():
+def completed_orders(start: str = None, end: str = None, since: int = None):
     logger.info(f"Fetching account completed orders information")
-    return tws.completed_orders()
+    return json_response(tws.completed_orders(start, end, since))
 
 @handle_exception
 def open_orders():
     logger.info(f"Fetching account open orders information")
-    return tws.open_orders()
+    return json_response(tws.open_orders())
 
 @handle_exception
+@accepted_when_pending
 def close_all_positions():
     logger.info(f"Closing all positions")
-    return tws.close_all_positions()
\ No newline at end of file
+    return json_response(tws.close_all_positions())
\ No newline at end of file
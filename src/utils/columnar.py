@@ -0,0 +1,38 @@
+from flask import Response
+from src.utils.encoder import encode
+import pandas as pd
+import io
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+# Formats a table of columns can be sent as, besides the default row-oriented JSON
+FORMATS = ('columns', 'arrow', 'csv')
+
+def _arrow(columns: dict) -> bytes:
+    if pa is None:
+        raise Exception("Arrow output requires pyarrow to be installed.")
+    # Contiguous numeric arrays are wrapped without a copy
+    table = pa.table({name: pa.array(values) for name, values in columns.items()})
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+def _csv(columns: dict) -> bytes:
+    return pd.DataFrame(columns, copy=False).to_csv(index=False).encode()
+
+def columnar_response(columns: dict, format: str) -> Response:
+    """
+    Sends a dict of NumPy arrays as columnar JSON (one array per field), an Arrow IPC stream or CSV.
+    All three load into a DataFrame without parsing a record per row.
+    """
+    if format == 'columns':
+        return Response(encode(columns), mimetype='application/json')
+    if format == 'arrow':
+        return Response(_arrow(columns), mimetype='application/vnd.apache.arrow.stream')
+    if format == 'csv':
+        return Response(_csv(columns), mimetype='text/csv')
+    raise Exception(f"Unsupported format '{format}', expected one of json, {', '.join(FORMATS)}.")
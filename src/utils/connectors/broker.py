@@ -0,0 +1,183 @@
+from multiprocessing.connection import Listener, Client
+from src.utils.connectors.tws import TWSConnector, OrdersPending
+from src.utils.logger import logger
+import inspect
+import threading
+import os
+
+# Extra seconds a worker waits on top of the broker's own IBKR timeout
+_TIMEOUT_MARGIN = 5
+
+# IBKR round trips a call can chain, each bounded by IBKR_REQUEST_TIMEOUT (a reconnect counts as one)
+_CHAINED_REQUESTS = {'place_orders': 2, 'close_all_positions': 5}
+
+# Calls that send orders. Once the broker has one it may be placed, so a worker that stops waiting reports it as pending
+_ORDER_METHODS = {'place_order', 'place_orders', 'cancel_order', 'close_all_positions'}
+
+# Longest pause between two items of a streamed result (a paced historical batch)
+_STREAM_TIMEOUT = 600
+
+def _authkey() -> bytes:
+    authkey = os.getenv('IBKR_BROKER_AUTHKEY') or os.getenv('JWT_SECRET_KEY')
+    if not authkey:
+        raise Exception("IBKR_BROKER_AUTHKEY or JWT_SECRET_KEY must be set in the environment variables.")
+    return authkey.encode()
+
+class BrokerServer:
+
+    def __init__(self):
+        """
+        Owns the single IB session and serves TWSConnector calls to every gunicorn worker over a Unix socket.
+        Each worker connection gets its own thread, and the connector runs in async mode so they don't serialize.
+        """
+        logger.announcement('Initializing IBKR Broker', 'info')
+        os.environ['IBKR_ASYNC'] = 'true'
+        self.tws = TWSConnector()
+
+        self.path = os.getenv('IBKR_BROKER_SOCKET')
+        if self.path is None:
+            raise Exception("IBKR_BROKER_SOCKET must be set in the environment variables.")
+        authkey = _authkey()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.listener = Listener(self.path, family='AF_UNIX', authkey=authkey)
+        logger.announcement(f'Successfully initialized IBKR Broker on {self.path}', 'success')
+
+    def serve_forever(self):
+        while True:
+            try:
+                connection = self.listener.accept()
+            except Exception as e:
+                logger.error(f"Error accepting broker connection: {str(e)}")
+                continue
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection):
+        try:
+            while True:
+                method, args, kwargs = connection.recv()
+                self._handle(connection, method, args, kwargs)
+        except (EOFError, OSError):
+            pass
+        finally:
+            connection.close()
+
+    def _handle(self, connection, method: str, args: tuple, kwargs: dict):
+        try:
+            if method.startswith('_') or not callable(getattr(self.tws, method, None)):
+                raise Exception(f"Unknown broker method: {method}")
+            result = getattr(self.tws, method)(*args, **kwargs)
+        except OrdersPending as e:
+            connection.send(('pending', str(e)))
+            return
+        except Exception as e:
+            connection.send(('error', str(e)))
+            return
+
+        if not inspect.isgenerator(result):
+            connection.send(('result', result))
+            return
+
+        connection.send(('stream', None))
+        try:
+            for item in result:
+                connection.send(('item', item))
+        except OSError:
+            # The worker went away mid-stream, closing the generator releases its subscriptions
+            result.close()
+            raise
+        except Exception as e:
+            connection.send(('error', str(e)))
+            return
+        connection.send(('end', None))
+
+class BrokerClient:
+
+    def __init__(self):
+        """
+        Drop-in replacement for TWSConnector inside gunicorn workers.
+        Every method call is forwarded to the broker process, reusing a small pool of socket connections.
+        """
+        self.path = os.getenv('IBKR_BROKER_SOCKET')
+        self.authkey = _authkey()
+        self.request_timeout = float(os.getenv('IBKR_REQUEST_TIMEOUT', 60))
+        self.pool = []
+        self.lock = threading.Lock()
+
+    def _connection(self):
+        with self.lock:
+            if self.pool:
+                return self.pool.pop()
+        return Client(self.path, family='AF_UNIX', authkey=self.authkey)
+
+    def _release(self, connection):
+        with self.lock:
+            self.pool.append(connection)
+
+    def _receive(self, connection, timeout: float):
+        if not connection.poll(timeout):
+            raise TimeoutError(f"Timed out after {timeout}s waiting for the IBKR broker")
+        return connection.recv()
+
+    def _stream(self, connection):
+        try:
+            while True:
+                kind, item = self._receive(connection, _STREAM_TIMEOUT)
+                if kind == 'end':
+                    break
+                if kind == 'error':
+                    raise Exception(item)
+                yield item
+        except BaseException:
+            connection.close()
+            raise
+        self._release(connection)
+
+    def _timeout(self, method: str, args: tuple, kwargs: dict) -> float:
+        """How long the broker may take on a call: its chained IBKR requests, the wait it was given if any, and the margin."""
+        timeout = _CHAINED_REQUESTS.get(method, 1) * self.request_timeout + _TIMEOUT_MARGIN
+        try:
+            arguments = inspect.signature(getattr(TWSConnector, method)).bind(None, *args, **kwargs)
+        except (AttributeError, TypeError):
+            return timeout
+        arguments.apply_defaults()
+        wait = arguments.arguments.get('timeout')
+        return timeout + (wait if isinstance(wait, (int, float)) else 0)
+
+    def _request(self, method: str, *args, **kwargs):
+        timeout = self._timeout(method, args, kwargs)
+        connection = self._connection()
+        try:
+            connection.send((method, args, kwargs))
+            kind, result = self._receive(connection, timeout)
+        except TimeoutError as e:
+            connection.close()
+            if method in _ORDER_METHODS:
+                raise OrdersPending(f"{str(e)}, the orders may still be placed")
+            raise
+        except Exception:
+            connection.close()
+            raise
+
+        if kind == 'stream':
+            return self._stream(connection)
+        self._release(connection)
+        if kind == 'pending':
+            raise OrdersPending(result)
+        if kind == 'error':
+            raise Exception(result)
+        return result
+
+    def __getattr__(self, method: str):
+        if method.startswith('_'):
+            raise AttributeError(method)
+        return lambda *args, **kwargs: self._request(method, *args, **kwargs)
+
+def connector():
+    """Returns the broker proxy when a broker process owns the IB session, otherwise the in-process connector."""
+    if os.getenv('IBKR_BROKER_SOCKET'):
+        return BrokerClient()
+    return TWSConnector()
+
+if __name__ == '__main__':
+    BrokerServer().serve_forever()
@@ -1,14 +1,22 @@
-from sqlalchemy import Boolean, create_engine, Column, Text, Integer, JSON
+from sqlalchemy import Boolean, Column, Text, Integer, JSON
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declarative_base
 
-from src.utils.managers.database_manager import DatabaseManager
+from src.utils.managers.database_manager import DatabaseManager, sqlite_engines
 from src.utils.logger import logger
 import uuid
 from datetime import datetime
 
 import os
 
+# Indexes for the columns the most frequent queries filter and sort on
+_INDEXES = {
+    'expense': ['date', ['account_id', 'date'], 'category'],
+}
+
+# Read results kept in memory, lookups of small reference tables like categories are served from here
+_CACHE_SIZE = 1024
+
 class SQLite:
     _instance = None
     _initialized = False
@@ -22,15 +30,18 @@ class SQLite:
         if not self._initialized:
             logger.announcement('Initializing SQLite Service', 'info')
 
-            self.db_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'laserfocus.db')
-            
-            self.db_url = 'sqlite:///laserfocus.db'
-            self.engine = create_engine(self.db_url)
+            # src/db is the volume the container mounts, so the database outlives the image
+            self.db_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'db', 'laserfocus.db'))
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+
+            self.db_url = f'sqlite:///{self.db_path}'
+            self.engine, self.read_engine = sqlite_engines(self.db_path)
             
             self.Base = declarative_base()
             self._setup_models()
             
-            self.db = DatabaseManager(base=self.Base, engine=self.engine)
+            self.db = DatabaseManager(base=self.Base, engine=self.engine, read_engine=self.read_engine, cache_size=_CACHE_SIZE)
+            self.db.ensure_indexes(_INDEXES)
             
             logger.announcement('Successfully initialized SQLite Service', 'success')
             self._initialized = True
@@ -1,5 +1,17 @@
 from ib_insync import *
 from src.utils.logger import logger
+from src.utils.managers.history_manager import HistoryManager
+from src.utils.managers.pacing_manager import PacingManager
+from src.utils.managers.subscription_manager import SubscriptionManager
+from src.utils.managers.stream_manager import StreamManager
+from src.utils.managers.quote_table_manager import QuoteTableManager
+from src.utils.managers.health_manager import HealthManager
+from src.utils.managers.contract_manager import ContractManager
+from src.utils.managers.account_state_manager import AccountStateManager
+from src.utils.managers.journal_manager import JournalManager
+import functools
+import asyncio
+import threading
 import time
 import math
 import os
@@ -8,6 +20,37 @@ from datetime import datetime
 logger.announcement("Initializing TWS Connector", 'info')
 logger.announcement("TWS Connector initialized", 'success')
 
+# Health probing of the gateway in async mode
+_PROBE_SECONDS = 5
+_PROBE_TIMEOUT_SECONDS = 5
+
+# How long a batch of orders waits for IB to acknowledge every order
+_ACK_TIMEOUT_SECONDS = 5
+
+# Order states that mean IB has not acknowledged the order yet
+_UNACKNOWLEDGED_STATUSES = {'', OrderStatus.PendingSubmit, OrderStatus.ApiPending}
+
+# Order states that mean IB answered but will not work the order
+_REJECTED_STATUSES = {OrderStatus.Cancelled, OrderStatus.ApiCancelled, OrderStatus.Inactive}
+
+class OrdersPending(Exception):
+    """Raised when a call that sends orders stops waiting for IBKR, the orders may still have been placed."""
+
+def serve_cached_when_down(func):
+    """Remembers the last result of a connector method and serves it while the gateway is unavailable."""
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        try:
+            result = func(self, *args, **kwargs)
+        except Exception:
+            if self.health.available() or func.__name__ not in self.fallback:
+                raise
+            logger.warning(f"IBKR unavailable, serving last known {func.__name__}")
+            return self.fallback[func.__name__]
+        self.fallback[func.__name__] = result
+        return result
+    return wrapper
+
 class TWSConnector:
     _instance = None
     _initialized = False
@@ -24,31 +67,164 @@ class TWSConnector:
         self.ib = IB()
         self.host = os.getenv('IBKR_HOST', None)
         self.port = int(os.getenv('IBKR_PORT', None))
+        self.timeout = float(os.getenv('IBKR_REQUEST_TIMEOUT', 60))
+
+        # In async mode the IB client lives on its own event loop thread and request threads
+        # dispatch coroutines to it, so independent requests no longer queue behind each other
+        self.async_mode = os.getenv('IBKR_ASYNC', 'false').lower() == 'true'
+        if self.async_mode:
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self.loop.run_forever, name='ibkr-loop', daemon=True)
+            self.thread.start()
+
+        self.health = HealthManager()
+        self.fallback = {}
+        self.history = HistoryManager()
+        self.contracts = ContractManager(self.ib)
+        self.journal = JournalManager(self.ib)
+        self.account = AccountStateManager(self.ib)
+        self.pacing = PacingManager()
+        self.subscriptions = SubscriptionManager(self.ib)
+        self.streams = StreamManager(self.ib, self.subscriptions, self._wait)
+        self.quotes = QuoteTableManager(writer=True)
+        self.ib.pendingTickersEvent += self.quotes.publish
+        self.ib.disconnectedEvent += self.health.trip
         self.connect()
+        if self.async_mode:
+            asyncio.run_coroutine_threadsafe(self._monitor(), self.loop)
         TWSConnector._initialized = True
 
+    def _dispatch(self, coroutine, timeout: float = None):
+        """Runs a coroutine on the IB event loop and waits for its result."""
+        timeout = timeout or self.timeout
+        if not self.async_mode:
+            try:
+                return self.ib.run(coroutine, timeout=timeout)
+            except TimeoutError:
+                raise TimeoutError(f"Timed out after {timeout}s waiting for IBKR")
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Timed out after {timeout}s waiting for IBKR")
+
+    def _ensure_connected(self):
+        """Fails fast while the gateway is down. In sync mode the reconnect happens here once the backoff allows it."""
+        if self.ib.isConnected() and self.health.available():
+            return
+        if not self.async_mode and self.health.ready():
+            self._dispatch(self._reconnect())
+            if self.ib.isConnected():
+                return
+        raise ConnectionError(f"IBKR gateway unavailable, next reconnect in {self.health.retry_in():.0f}s")
+
+    def _run(self, coroutine, timeout: float = None):
+        """Runs a connector coroutine, going through the circuit breaker."""
+        try:
+            self._ensure_connected()
+        except ConnectionError:
+            coroutine.close()
+            raise
+        try:
+            result = self._dispatch(coroutine, timeout)
+        except ConnectionError:
+            self.health.failure()
+            raise
+        except TimeoutError:
+            # A slow request or a long pacing wait says nothing about the gateway, a dropped socket does
+            if not self.ib.isConnected():
+                self.health.failure()
+            raise
+        self.health.success()
+        return result
+
+    async def _invoke(self, func, *args):
+        return func(*args)
+
+    def _call(self, func, *args, guard: bool = True):
+        """Calls a synchronous IB method on the thread that owns the IB event loop."""
+        if guard:
+            self._ensure_connected()
+        if not self.async_mode:
+            return func(*args)
+        return self._dispatch(self._invoke(func, *args))
+
+    def _qualify(self, *contracts: Contract):
+        """Qualifies contracts from the contract cache, asking IB only for the ones it doesn't know."""
+        misses = [contract for contract in contracts if not self.contracts.apply(contract)]
+        if misses:
+            self._run(self.contracts.qualify(*misses))
+
+    async def _reconnect(self) -> bool:
+        logger.info(f"Reconnecting to IBKR at {self.host}:{self.port}")
+        self.ib.disconnect()
+        try:
+            await self.ib.connectAsync(self.host, self.port, clientId=1)
+        except Exception as e:
+            logger.error(f"Error reconnecting to IB: {str(e)}")
+            self.health.reconnect_failed()
+            return False
+        self.subscriptions.restore()
+        self.health.success()
+        logger.success("Reconnected to IBKR")
+        return True
+
+    async def _monitor(self):
+        """Probes the gateway and reconnects with backoff, running on the IB event loop in async mode."""
+        while True:
+            await asyncio.sleep(_PROBE_SECONDS)
+            if self.ib.isConnected() and self.health.available():
+                try:
+                    await asyncio.wait_for(self.ib.reqCurrentTimeAsync(), _PROBE_TIMEOUT_SECONDS)
+                    continue
+                except Exception as e:
+                    logger.warning(f"IBKR health probe failed: {str(e)}")
+                    self.health.trip()
+            if self.health.ready():
+                await self._reconnect()
+
+    def _wait(self, seconds: float):
+        """Lets IB events arrive for a while, running the event loop ourselves when nobody else does."""
+        if not self.async_mode:
+            self.ib.sleep(seconds)
+            return
+        time.sleep(seconds)
+
+    def _pump(self):
+        """
+        Applies the IB events already waiting on the socket before state fed by them is read.
+        In sync mode nothing runs the event loop between requests, in async mode its thread already does.
+        """
+        if not self.async_mode and self.ib.isConnected():
+            self._wait(0)
+
     def connect(self) -> bool:
         logger.info(f"Connecting to IBKR at {self.host}:{self.port}")
+        if self.host is None or self.port is None:
+            raise Exception("IBKR_HOST and IBKR_PORT must be set in the environment variables.")
+
+        # A gateway that is down at startup is retried by the health checks instead of failing the import
         try:
-            if self.host is None or self.port is None:
-                raise Exception("IBKR_HOST and IBKR_PORT must be set in the environment variables.")
-            
-            self.ib.connect(self.host, self.port, clientId=1)
-            if self.ib.isConnected():
-                logger.success("Connected to IBKR")
-                return True
-            else:
-                logger.error("Failed to connect to IBKR")
-                return False
+            self._dispatch(self.ib.connectAsync(self.host, self.port, clientId=1))
         except Exception as e:
             logger.error(f"Error connecting to IB: {str(e)}")
-            raise Exception(f"Error connecting to IB: {str(e)}")
+            self.health.reconnect_failed()
+            return False
+
+        if self.ib.isConnected():
+            logger.success("Connected to IBKR")
+            return True
+        logger.error("Failed to connect to IBKR")
+        self.health.reconnect_failed()
+        return False
         
     def disconnect(self) -> bool:
         logger.info("Disconnecting from IBKR")
         if self.ib.isConnected():
             try:
-                self.ib.disconnect()
+                self._call(self.ib.disconnect, guard=False)
                 logger.success("Disconnected from IBKR")
                 return True
             except Exception as e:
@@ -57,43 +233,110 @@ class TWSConnector:
         return False
 
     # Market
-    def historical_data(self, contract: Contract, period: str = '1 Y') -> list:
-        logger.info(f"Getting historical data for {contract} to {period}")
+    async def _historical_data_async(self, contract: Contract, period: str, bar_size: str, columnar: bool = False):
+        read = self.history.read_columns if columnar else self.history.read
+        await self.contracts.qualify(contract)
+        duration = self.history.missing_duration(contract, period, bar_size)
+        if duration is None:
+            logger.info(f"Serving historical data for {contract.symbol} from cache")
+            return read(contract, period, bar_size)
+
+        logger.info(f"Requesting {duration} of {bar_size} bars for {contract.symbol} from IBKR")
+        contract_key = self.history.contract_key(contract)
         current_date = datetime.now().strftime('%Y%m%d %H:%M:%S')
-        try:
-            historical_data_response = self.ib.reqHistoricalData(
+        historical_data_response = await self.pacing.run(
+            (contract_key, duration, bar_size, 'TRADES', 1),
+            contract_key,
+            lambda: self.ib.reqHistoricalDataAsync(
                 contract, 
                 endDateTime=current_date, 
-                durationStr=period,  
-                barSizeSetting='1 day', 
+                durationStr=duration,  
+                barSizeSetting=bar_size, 
                 whatToShow='TRADES', 
                 useRTH=1
             )
-            historical_data = []
-            for bar in historical_data_response:
-                historical_data.append(bar.dict())
-            
+        )
+        self.history.store(contract, period, bar_size, historical_data_response, duration == period)
+        return read(contract, period, bar_size)
+
+    def historical_data(self, contract: Contract, period: str = '1 Y', bar_size: str = '1 day', columnar: bool = False):
+        """
+        Returns the bars of the window, as a list of bar dicts or, with columnar, as one NumPy array per field.
+        """
+        logger.info(f"Getting historical data for {contract} to {period}")
+        try:
+            historical_data = self._run(self._historical_data_async(contract, period, bar_size, columnar))
             logger.success(f"Successfully got historical data")
             return historical_data
         except Exception as e:
+            if not self.health.available():
+                read = self.history.read_columns if columnar else self.history.read
+                historical_data = read(contract, period, bar_size)
+                if len(historical_data['date'] if columnar else historical_data):
+                    logger.warning(f"IBKR unavailable, serving stored historical data")
+                    return historical_data
             logger.error(f"Error getting historical data: {str(e)}")
             raise Exception(f"Error getting historical data: {str(e)}")
 
+    def historical_data_batch(self, contracts: list, period: str = '1 Y', bar_size: str = '1 day', columnar: bool = False):
+        """
+        Fetches historical data for many contracts concurrently through the pacing manager.
+        Returns a generator of one result per contract in completion order. The connection check and the requests
+        happen before it is returned, so a gateway that is down fails the call instead of a response already streaming.
+        """
+        logger.info(f"Getting historical data for {len(contracts)} contracts to {period}")
+        results = asyncio.Queue()
+
+        async def _fetch(contract: Contract):
+            try:
+                data = await self._historical_data_async(contract, period, bar_size, columnar)
+                await results.put({'symbol': contract.symbol, 'data': data})
+            except Exception as e:
+                logger.error(f"Error getting historical data for {contract.symbol}: {str(e)}")
+                await results.put({'symbol': contract.symbol, 'error': str(e)})
+
+        async def _start():
+            await self.contracts.qualify(*contracts)
+            return [asyncio.ensure_future(_fetch(contract)) for contract in contracts]
+
+        async def _cancel(tasks: list):
+            for task in tasks:
+                task.cancel()
+
+        tasks = self._run(_start())
+
+        def _results():
+            pending = [contract.symbol for contract in contracts]
+            try:
+                for _ in tasks:
+                    try:
+                        # A paced request can wait out a whole 10 minute pacing window
+                        result = self._run(results.get(), timeout=600)
+                    except Exception as e:
+                        # Results are already being sent, so the symbols still missing are reported instead of raised
+                        logger.error(f"Error getting historical data: {str(e)}")
+                        for symbol in pending:
+                            yield {'symbol': symbol, 'error': str(e)}
+                        return
+                    pending.remove(result['symbol'])
+                    yield result
+                logger.success(f"Successfully got historical data for {len(contracts)} contracts")
+            finally:
+                self._dispatch(_cancel(tasks))
+
+        return _results()
+
     def current_data(self, contract: Contract) -> dict:
         logger.info(f"Getting latest price")
         try:
-            self.ib.reqMarketDataType(3)
-            ticker = self.ib.reqMktData(contract, '233', False, False, [])
-            
-            # Wait for market data
-            timeout = 10  # 10 second timeout
-            start_time = time.time()
-            while math.isnan(ticker.last) and (time.time() - start_time) < timeout:
-                self.ib.sleep(0.1)
-                logger.info(f"Waiting for market data...")
-            
+            self._qualify(contract)
+            ticker = self._call(self.subscriptions.get, contract)
             if math.isnan(ticker.last):
-                raise Exception("Timeout waiting for market data")
+                logger.info(f"Waiting for market data...")
+                self._run(self.subscriptions.wait_for_last(ticker, timeout=10))
+            else:
+                # Process ticks already waiting on the socket, no request is sent
+                self._wait(0)
             
             logger.success(f"Successfully got latest price: {ticker.last}")
             stock_data = {
@@ -104,69 +347,92 @@ class TWSConnector:
                 'askSize': ticker.askSize
             }
             return stock_data
+        except TimeoutError:
+            logger.error(f"Error getting latest price: Timeout waiting for market data")
+            raise Exception(f"Error getting latest price: Timeout waiting for market data")
         except Exception as e:
             logger.error(f"Error getting latest price: {str(e)}")
             raise Exception(f"Error getting latest price: {str(e)}")
     
+    def open_stream(self, contracts: list) -> int:
+        logger.info(f"Opening quote stream for {len(contracts)} contracts")
+        try:
+            self._qualify(*contracts)
+            client_id = self._call(self.streams.open, contracts)
+            logger.success(f"Successfully opened quote stream {client_id}")
+            return client_id
+        except Exception as e:
+            logger.error(f"Error opening quote stream: {str(e)}")
+            raise Exception(f"Error opening quote stream: {str(e)}")
+
+    def stream_updates(self, client_id: int, interval: float = 1.0):
+        try:
+            yield from self.streams.updates(client_id, interval)
+        finally:
+            self._call(self.streams.close, client_id, guard=False)
+    
     # Account
+    def account_snapshot(self, section: str) -> dict:
+        logger.info(f"Getting account {section} snapshot")
+        try:
+            builders = {
+                'summary': self.account_summary,
+                'positions': self.positions,
+                'portfolio': self.portfolio,
+                'pnl': self.pnl
+            }
+            if section not in builders:
+                raise Exception(f"Unknown account section: {section}")
+            # The version counters only move once pending account events are processed
+            self._pump()
+            snapshot = self.account.snapshot(section, builders[section])
+            logger.success(f"Successfully got account {section} snapshot")
+            return snapshot
+        except Exception as e:
+            logger.error(f"Error getting account {section} snapshot: {str(e)}")
+            raise Exception(f"Error getting account {section} snapshot: {str(e)}")
+
+    @serve_cached_when_down
     def account_summary(self) -> list:
         logger.info("Getting account summary")
         try:
-            account_summary = self.ib.accountSummary()
+            account_summary = self._run(self.ib.accountSummaryAsync())
             logger.success(f"Successfully got account summary")
-            formatted_summary = []
-            for summary in account_summary:
-                formatted_summary.append({
-                    'account': summary.account,
-                    'tag': summary.tag,
-                    'value': summary.value,
-                    'currency': summary.currency,
-                    'modelCode': summary.modelCode
-                })
-            return formatted_summary
+            return list(account_summary)
         except Exception as e:
             logger.error(f"Error getting account summary: {str(e)}")
             raise Exception(f"Error getting account summary: {str(e)}")
 
+    @serve_cached_when_down
     def positions(self) -> list:
         logger.info("Getting positions")
         try:
-            positions = self.ib.positions()
+            positions = self._call(self.ib.positions)
             logger.info(f"You have {len(positions)} positions overall")
-            
-            # Convert positions to serializable format
-            formatted_positions = []
-            for pos in positions:
-                formatted_positions.append(pos.dict())
-            
             logger.success(f"Successfully got positions")
-            return formatted_positions
+            return list(positions)
         except Exception as e:
             logger.error(f"Error getting positions: {str(e)}")
             raise Exception(f"Error getting positions: {str(e)}")
 
+    @serve_cached_when_down
     def portfolio(self) -> list:
         logger.info("Getting portfolio")
         try:
-            portfolio_response = self.ib.portfolio()
+            portfolio_response = self._call(self.ib.portfolio)
             logger.success(f"Successfully got portfolio")
-            formatted_portfolio = []
-            for item in portfolio_response:
-                formatted_portfolio.append(item.dict())
-            return formatted_portfolio
+            return list(portfolio_response)
         except Exception as e:
             logger.error(f"Error getting portfolio: {str(e)}")
             raise Exception(f"Error getting portfolio: {str(e)}")
         
+    @serve_cached_when_down
     def pnl(self) -> list:
         logger.info("Getting PNL")
         try:
-            pnl_response = self.ib.pnl()
+            pnl_response = self._call(self.ib.pnl)
             logger.success(f"Successfully got PNL")
-            formatted_pnl = []
-            for item in pnl_response:
-                formatted_pnl.append(item.dict())
-            return formatted_pnl
+            return list(pnl_response)
         except Exception as e:
             logger.error(f"Error getting PNL: {str(e)}")
             raise Exception(f"Error getting PNL: {str(e)}")
@@ -174,37 +440,60 @@ class TWSConnector:
     def pnl_single(self, contract: Contract) -> list:
         logger.info(f"Getting PNL for {contract}")
         try:
-            pnl_single_response = self.ib.pnlSingle(contract)
+            self._qualify(contract)
+            pnl_single_response = self._call(self.ib.pnlSingle, contract)
             logger.success(f"Successfully got PNL for {contract}")
-            formatted_pnl_single = []
-            for item in pnl_single_response:
-                formatted_pnl_single.append(item.dict())
-            return formatted_pnl_single
+            return list(pnl_single_response)
         except Exception as e:  
             logger.error(f"Error getting PNL for {contract}: {str(e)}")
             raise Exception(f"Error getting PNL for {contract}: {str(e)}")
 
+    def contract_details(self, contracts: list) -> list:
+        """Returns the ContractDetails of each contract, or None where IB has none, requested concurrently."""
+        logger.info(f"Getting contract details for {len(contracts)} contracts")
+        try:
+            self._qualify(*contracts)
+
+            async def _details():
+                return await asyncio.gather(*(self.ib.reqContractDetailsAsync(contract) for contract in contracts))
+
+            details = self._run(_details())
+            logger.success(f"Successfully got contract details")
+            return [contract_details[0] if contract_details else None for contract_details in details]
+        except Exception as e:
+            logger.error(f"Error getting contract details: {str(e)}")
+            raise Exception(f"Error getting contract details: {str(e)}")
+
     # Orders
     def order_status(self, orderId: int) -> dict:
         logger.info(f"Getting order status: {orderId}")
         try:
-            order = self.ib.orderStatus(orderId)
+            self._pump()
+            order = self.journal.order_status(orderId)
+            if order is None:
+                raise Exception(f"Order {orderId} not found")
             logger.success(f"Successfully got order status")
-            return order.dict()
+            return order
         except Exception as e:
             logger.error(f"Error getting order status: {str(e)}")
             raise Exception(f"Error getting order status: {str(e)}")
         
-    def completed_orders(self) -> list:
+    def completed_orders(self, start: str = None, end: str = None, since: int = None):
+        """
+        Returns the completed orders, or with since only the orders and fills new or changed after that cursor,
+        as {'orders', 'fills', 'cursor'} where cursor is passed as since on the next call.
+        """
         logger.info("Getting completed orders")
         try:
-            orders_response = self.ib.reqCompletedOrders(False)
-            formatted_orders = []
-            for order in orders_response:
-                formatted_orders.append(order.dict())
-            logger.info(f"Successfully got {len(formatted_orders)} completed orders")
-            logger.success(f"Successfully got {len(formatted_orders)} completed orders")
-            return formatted_orders
+            # Events still waiting on the socket would otherwise only show up after an unrelated request
+            self._pump()
+            if since is not None:
+                changes = self.journal.changes(since)
+                logger.success(f"Successfully got {len(changes['orders'])} orders and {len(changes['fills'])} fills since {since}")
+                return changes
+            orders_response = self.journal.completed_orders(start, end)
+            logger.success(f"Successfully got {len(orders_response)} completed orders")
+            return orders_response
         except Exception as e:
             logger.error(f"Error getting completed orders: {str(e)}")
             raise Exception(f"Error getting completed orders: {str(e)}")
@@ -212,13 +501,10 @@ class TWSConnector:
     def open_orders(self) -> list:
         logger.info("Getting open orders")
         try:
-            orders_response = self.ib.openOrders()
-            formatted_orders = []
-            for order in orders_response:
-                formatted_orders.append(order.dict())
-            logger.info(f"Successfully got {len(formatted_orders)} open orders")
-            logger.success(f"Successfully got {len(formatted_orders)} open orders")
-            return formatted_orders
+            self._pump()
+            orders_response = self.journal.open_orders()
+            logger.success(f"Successfully got {len(orders_response)} open orders")
+            return orders_response
         except Exception as e:
             logger.error(f"Error getting open orders: {str(e)}")
             raise Exception(f"Error getting open orders: {str(e)}")
@@ -227,10 +513,13 @@ class TWSConnector:
     def place_order(self, contract: Contract, order: Order) -> dict:
         logger.info(f"Placing order: {order}")
         try:
-            self.ib.qualifyContracts(contract)
-            trade = self.ib.placeOrder(contract, order)
+            self._qualify(contract)
+            trade = self._call(self.ib.placeOrder, contract, order)
             logger.success(f"Successfully placed order")
-            return trade.dict()
+            return trade
+        except TimeoutError as e:
+            logger.warning(f"Order may still be placed: {str(e)}")
+            raise OrdersPending(f"Timed out waiting for IBKR, the order may still be placed: {str(e)}")
         except Exception as e:
             logger.error(f"Error placing order: {str(e)}")
             raise Exception(f"Error placing order: {str(e)}")
@@ -238,34 +527,118 @@ class TWSConnector:
     def cancel_order(self, orderId: int) -> bool:
         logger.info(f"Cancelling order: {orderId}")
         try:
-            self.ib.cancelOrder(orderId)
+            self._call(self.ib.cancelOrder, orderId)
             logger.success(f"Successfully cancelled order")
             return True
+        except TimeoutError as e:
+            logger.warning(f"Order may still be cancelled: {str(e)}")
+            raise OrdersPending(f"Timed out waiting for IBKR, the order may still be cancelled: {str(e)}")
         except Exception as e:  
             logger.error(f"Error cancelling order: {str(e)}")
             raise Exception(f"Error cancelling order: {str(e)}")
     
-    def exec_details(self, orderId: int, contract: Contract) -> list:
+    def exec_details(self, orderId: int = None, contract: Contract = None, start: str = None, end: str = None) -> list:
         logger.info(f"Getting exec details: {orderId}")
         try:
-            exec_details = self.ib.execDetails(orderId, contract)
+            conId = symbol = None
+            if contract is not None:
+                # Only the local contract cache is used, the journal must answer while IB is down
+                self.contracts.apply(contract)
+                conId, symbol = contract.conId, contract.symbol
+            self._pump()
+            exec_details = self.journal.executions(orderId, conId, symbol, start, end)
             logger.success(f"Successfully got exec details")
-            formatted_exec_details = []
-            for item in exec_details:
-                formatted_exec_details.append(item.dict())
-            return formatted_exec_details
+            return exec_details
         except Exception as e:
             logger.error(f"Error getting exec details: {str(e)}")
             raise Exception(f"Error getting exec details: {str(e)}")
     
-    def close_all_positions(self) -> bool:
+    async def _place_orders_async(self, orders: list, timeout: float) -> list:
+        """
+        Qualifies every contract in one batch, submits all the orders back to back,
+        then waits for their acknowledgements concurrently until the deadline.
+        """
+        await self.contracts.qualify(*(contract for contract, _ in orders))
+
+        results = []
+        trades = []
+        for contract, order in orders:
+            if not contract.conId:
+                results.append({'contract': contract, 'order': order, 'error': 'Contract could not be qualified'})
+                continue
+            trade = self.ib.placeOrder(contract, order)
+            results.append({'trade': trade})
+            trades.append(trade)
+
+        async def _acknowledged(trade: Trade):
+            while trade.orderStatus.status in _UNACKNOWLEDGED_STATUSES and not trade.isDone():
+                await trade.statusEvent
+
+        if trades:
+            acknowledgements = [asyncio.ensure_future(_acknowledged(trade)) for trade in trades]
+            _, pending = await asyncio.wait(acknowledgements, timeout=timeout)
+            for acknowledgement in pending:
+                acknowledgement.cancel()
+
+        for result in results:
+            if 'trade' in result:
+                status = result['trade'].orderStatus.status
+                result['acknowledged'] = status not in _UNACKNOWLEDGED_STATUSES and status not in _REJECTED_STATUSES
+        return results
+
+    def place_orders(self, orders: list, timeout: float = _ACK_TIMEOUT_SECONDS) -> list:
+        """
+        Places a batch of (contract, order) pairs.
+        Returns one result per order with its trade and whether IB acknowledged it, or the error that kept it from being sent.
+        """
+        logger.info(f"Placing {len(orders)} orders")
+        try:
+            results = self._run(self._place_orders_async(orders, timeout), timeout=timeout + self.timeout)
+            acknowledged = sum(1 for result in results if result.get('acknowledged'))
+            logger.success(f"Successfully placed {len(orders)} orders, {acknowledged} acknowledged")
+            return results
+        except TimeoutError as e:
+            logger.warning(f"Orders may still be placed: {str(e)}")
+            raise OrdersPending(f"Timed out waiting for IBKR, the orders may still be placed: {str(e)}")
+        except Exception as e:
+            logger.error(f"Error placing orders: {str(e)}")
+            raise Exception(f"Error placing orders: {str(e)}")
+
+    def _cancel_orders(self, orders: list):
+        for order in orders:
+            self.ib.cancelOrder(order)
+
+    def close_all_positions(self, timeout: float = _ACK_TIMEOUT_SECONDS) -> dict:
+        """
+        Cancels this client's open orders, then flattens every position with market orders placed as one batch.
+        Orders from other clients and from TWS itself are left alone, unlike a global cancel.
+        """
         logger.info("Closing all positions")
         try:
-            orders = self.ib.orders()
-            for order in orders:
-                self.ib.cancelOrder(order)
-            logger.success("Successfully closed all positions")
-            return True
+            open_orders = self._call(self.ib.openOrders)
+            if open_orders:
+                self._call(self._cancel_orders, open_orders)
+
+            orders = []
+            for position in self._call(self.ib.positions):
+                if not position.position:
+                    continue
+                # Position contracts come without a routing exchange, stocks are routed through SMART
+                # and the other types keep the exchange they are listed on
+                contract = Contract.create(**util.dataclassNonDefaults(position.contract))
+                if contract.secType == 'STK':
+                    contract.exchange = 'SMART'
+                order = MarketOrder('SELL' if position.position > 0 else 'BUY', abs(position.position), account=position.account)
+                orders.append((contract, order))
+
+            results = self.place_orders(orders, timeout) if orders else []
+            logger.success(f"Successfully cancelled {len(open_orders)} orders and closed {len(orders)} positions")
+            return {'cancelled': len(open_orders), 'orders': results}
+        except OrdersPending:
+            raise
+        except TimeoutError as e:
+            logger.warning(f"Positions may still be closing: {str(e)}")
+            raise OrdersPending(f"Timed out waiting for IBKR, orders may still be cancelled or placed: {str(e)}")
         except Exception as e:
             logger.error(f"Error closing all positions: {str(e)}")
-            raise Exception(f"Error closing all positions: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error closing all positions: {str(e)}")
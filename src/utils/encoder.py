@@ -0,0 +1,80 @@
+from flask import Response, stream_with_context
+from ib_insync import Contract, Order, Trade, Fill, BarData, PortfolioItem
+from werkzeug.http import http_date
+from operator import attrgetter
+from datetime import date, time
+import dataclasses
+import orjson
+
+# Datetimes are passed through so they keep the HTTP date format Flask's jsonify gave them
+_OPTIONS = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Encoded lines are sent in chunks of about this size instead of one write per item
+_CHUNK_SIZE = 64 * 1024
+
+# Field extractors per type, built once the first time a type is encoded
+_EXTRACTORS = {}
+
+def _build_extractor(cls):
+    if dataclasses.is_dataclass(cls):
+        fields = tuple(field.name for field in dataclasses.fields(cls))
+    elif issubclass(cls, tuple) and hasattr(cls, '_fields'):
+        fields = cls._fields
+    else:
+        return None
+
+    if len(fields) == 1:
+        getter = attrgetter(fields[0])
+        return lambda obj: {fields[0]: getter(obj)}
+    getter = attrgetter(*fields)
+    return lambda obj: dict(zip(fields, getter(obj)))
+
+# The ib_insync types we serialize the most are compiled up front
+for _cls in (Contract, Order, Trade, Fill, BarData, PortfolioItem):
+    _EXTRACTORS[_cls] = _build_extractor(_cls)
+
+def _default(obj):
+    cls = type(obj)
+    extractor = _EXTRACTORS.get(cls)
+    if extractor is None:
+        extractor = _build_extractor(cls)
+        if extractor is None:
+            if isinstance(obj, date):
+                return http_date(obj)
+            if isinstance(obj, time):
+                return obj.isoformat()
+            if isinstance(obj, (set, frozenset)):
+                return list(obj)
+            raise TypeError(f"Type is not JSON serializable: {cls.__name__}")
+        _EXTRACTORS[cls] = extractor
+    return extractor(obj)
+
+def encode(data) -> bytes:
+    """
+    Serializes connector results straight to JSON bytes.
+    ib_insync dataclasses and named tuples go through per-type field extractors, dates are HTTP dates as with jsonify and NaN becomes null.
+    """
+    return orjson.dumps(data, default=_default, option=_OPTIONS)
+
+def json_response(data, status: int = 200) -> Response:
+    return Response(encode(data), status=status, mimetype='application/json')
+
+def ndjson_lines(items):
+    """Encodes items as newline-delimited JSON, yielding chunks so a long stream is not sent one small write per item."""
+    chunk = bytearray()
+    for item in items:
+        chunk += encode(item)
+        chunk += b'\n'
+        if len(chunk) >= _CHUNK_SIZE:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+def ndjson_response(items, flush: bool = False) -> Response:
+    """
+    Streams an iterable as NDJSON, keeping memory flat however many items it yields.
+    flush sends every item as soon as it is ready instead of batching them into chunks.
+    """
+    lines = (encode(item) + b'\n' for item in items) if flush else ndjson_lines(items)
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
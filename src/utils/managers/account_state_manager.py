@@ -0,0 +1,54 @@
+from ib_insync import IB
+from src.utils.encoder import encode
+from src.utils.logger import logger
+from typing import Callable
+import itertools
+import time
+
+# IB events that change each account section
+_SECTION_EVENTS = {
+    'summary': ('accountSummaryEvent', 'accountValueEvent'),
+    'positions': ('positionEvent',),
+    'portfolio': ('updatePortfolioEvent',),
+    'pnl': ('pnlEvent',),
+}
+
+class AccountStateManager:
+
+    def __init__(self, ib: IB):
+        """
+        Versioned account state driven by ib_insync events.
+        Every event bumps the version of the section it touches, and the serialized JSON of a section
+        is kept until the next bump, so unchanged sections are served as cached bytes with a stable ETag.
+        """
+        self.ib = ib
+        self.counter = itertools.count(1)
+        self.versions = {section: next(self.counter) for section in _SECTION_EVENTS}
+        self.snapshots = {}
+
+        # Versions restart with the process, the epoch keeps old ETags from matching
+        self.epoch = int(time.time())
+
+        for section, events in _SECTION_EVENTS.items():
+            for event in events:
+                getattr(self.ib, event).connect(lambda *args, section=section: self.bump(section))
+        self.ib.connectedEvent += self.bump_all
+
+    def bump(self, section: str):
+        self.versions[section] = next(self.counter)
+
+    def bump_all(self, *args):
+        for section in self.versions:
+            self.bump(section)
+
+    def snapshot(self, section: str, build: Callable[[], list]) -> dict:
+        """Returns the section's serialized state and its ETag, rebuilding it only when an event changed it."""
+        version = self.versions[section]
+        cached = self.snapshots.get(section)
+        if cached is None or cached[0] != version:
+            # Capture the version before building, an event arriving meanwhile leaves the section stale
+            body = encode(build())
+            self.snapshots[section] = (version, body)
+            cached = (version, body)
+            logger.info(f"Rebuilt {section} snapshot at version {version}")
+        return {'etag': f'{self.epoch}-{section}-{cached[0]}', 'body': cached[1]}
@@ -0,0 +1,335 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
+from sqlalchemy.ext.declarative import declarative_base
+from src.utils.managers.database_manager import DatabaseManager, _apply_pragmas, _SQLITE_PRAGMAS, _BATCH_SIZE, _CACHE_TTL
+from src.utils.logger import logger
+from datetime import datetime
+from functools import wraps
+from flask import Response
+import json
+
+# Asyncio drivers swapped in for the sync URLs the app is configured with
+_ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+def async_engine(url: str, **kwargs) -> AsyncEngine:
+    """
+    Creates an asyncio engine from a sqlite or postgresql URL, replacing a sync driver like psycopg2 with aiosqlite or asyncpg.
+    SQLite connections get the same pragmas as sqlite_engines. Pass poolclass=NullPool when the engine is shared by several event loops.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in _ASYNC_DRIVERS:
+        raise Exception(f"No async driver for {backend} databases")
+    engine = create_async_engine(url.set(drivername=_ASYNC_DRIVERS[backend]), **kwargs)
+    if backend == 'sqlite':
+        _apply_pragmas(engine.sync_engine, {'journal_mode': 'WAL', **_SQLITE_PRAGMAS})
+    return engine
+
+class AsyncDatabaseManager(DatabaseManager):
+
+    def __init__(self, base: declarative_base, engine: AsyncEngine, read_engine: AsyncEngine = None, cache_size: int = 0, cache_ttl: float = _CACHE_TTL):
+        """
+        DatabaseManager on SQLAlchemy's asyncio extension, every operation is a coroutine.
+        Statements, filters and conversions are shared with the sync manager and only the round trips are awaited,
+        so one worker can have many queries in flight. The schema is reflected on the first call, which needs a connection.
+        """
+        self._setup(base, engine, read_engine, cache_size, cache_ttl)
+        self.initialized = False
+
+    async def _ready(self, *tables: str):
+        """Runs the schema setup on first use and reflects any of the tables not seen yet."""
+        if not self.initialized:
+            async with self.engine.begin() as connection:
+                await connection.run_sync(self._initialize)
+            self.initialized = True
+        for table in tables:
+            if table not in self.tables:
+                async with self.engine.connect() as connection:
+                    await connection.run_sync(lambda sync_connection: self._table(table, sync_connection))
+
+    def with_session(self, func, engine=None):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with AsyncSession(bind=engine or self.engine) as session:
+                try:
+                    result = await func(session, *args, **kwargs)
+                    await session.commit()
+                    return result
+                except Exception as e:
+                    await session.rollback()
+                    logger.error(f"Database error in {func.__name__}: {str(e)}")
+                    raise Exception(f"Database error: {str(e)}")
+        return wrapper
+
+    async def create(self, table: str, data: dict = None) -> str:
+        @self.with_session
+        async def _create(session, table: str, data: dict = None):
+            logger.info(f'Attempting to create new entry in table: {table}')
+
+            if not data:
+                raise Exception("Data to create must be provided.")
+
+            await self._ready(table)
+            model = self.models.get(table)
+            if not model:
+                raise Exception(f"Model not found for table: {table}")
+
+            current_time = datetime.now().strftime('%Y%m%d%H%M%S')
+            data = {
+                'created': current_time,
+                'updated': current_time,
+                **self._dates_to_timestamp(data)
+            }
+
+            new_record = model(**data)
+            session.add(new_record)
+            await session.flush()
+
+            logger.success(f'Successfully created entry with id: {new_record.id}')
+            return str(new_record.id)
+
+        try:
+            return await _create(table, data)
+        finally:
+            self._invalidate(table)
+
+    async def create_many(self, table: str, data=None, ignore_conflicts: bool = False) -> int:
+        """Coroutine version of DatabaseManager.create_many."""
+        @self.with_session
+        async def _create_many(session, table: str, data=None, ignore_conflicts: bool = False):
+            if data is None or len(data) == 0:
+                raise Exception("Data to create must be provided.")
+
+            logger.info(f'Attempting to create {len(data)} entries in table: {table}')
+            await self._ready(table)
+            tbl = self._table(table)
+            rows = self._records(data, tbl)
+
+            statement = self._conflict_insert(tbl).on_conflict_do_nothing() if ignore_conflicts else tbl.insert()
+            await session.execute(statement, rows)
+            await session.flush()
+
+            logger.success(f'Successfully created {len(rows)} entries in table: {table}')
+            return len(rows)
+
+        try:
+            return await _create_many(table, data, ignore_conflicts)
+        finally:
+            self._invalidate(table)
+
+    async def upsert_many(self, table: str, data=None, conflict: list = None, columns: list = None) -> int:
+        """Coroutine version of DatabaseManager.upsert_many."""
+        @self.with_session
+        async def _upsert_many(session, table: str, data=None, conflict: list = None, columns: list = None):
+            if data is None or len(data) == 0:
+                raise Exception("Data to upsert must be provided.")
+
+            logger.info(f'Attempting to upsert {len(data)} entries in table: {table}')
+            await self._ready(table)
+            tbl = self._table(table)
+            rows = self._records(data, tbl)
+
+            conflict = conflict or [column.name for column in tbl.primary_key.columns]
+            columns = columns or [column for column in rows[0] if column != 'created']
+            statement = self._conflict_insert(tbl)
+            set_ = {column: statement.excluded[column] for column in columns if column not in conflict}
+            if set_:
+                statement = statement.on_conflict_do_update(index_elements=conflict, set_=set_)
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=conflict)
+            await session.execute(statement, rows)
+            await session.flush()
+
+            logger.success(f'Successfully upserted {len(rows)} entries in table: {table}')
+            return len(rows)
+
+        try:
+            return await _upsert_many(table, data, conflict, columns)
+        finally:
+            self._invalidate(table)
+
+    async def read(self, table: str, query: dict = None) -> list:
+        @self.with_read_session
+        async def _read(session, table: str, query: dict = None):
+            logger.info(f'Attempting to read entry from table: {table} with query: {query}')
+
+            if query is None:
+                raise Exception("Query must be provided.")
+
+            await self._ready(table)
+            query, order, limit = self._ordering(table, query)
+            filters, params = self._filters(table, query)
+            statement = self._statement('select', table, filters, order=order, limit=limit is not None)
+            if limit is not None:
+                params['limit'] = limit
+            self._log_sql(statement, params)
+
+            result = await session.execute(statement, params)
+            serialized_results = self._convert(table, list(result.keys()), result.all())
+            logger.success(f'Successfully read {len(serialized_results)} entries from table: {table}')
+            return serialized_results
+
+        key, generation, rows = self._cached(table, query)
+        if rows is not None:
+            return rows
+        rows = await _read(table, query)
+        self._store(key, generation, rows)
+        return rows
+
+    async def read_iter(self, table: str, query: dict = None, after=None, key: str = None, limit: int = None, batch_size: int = _BATCH_SIZE):
+        """
+        Coroutine version of DatabaseManager.read_iter, validating on await and returning an async iterator of the rows:
+        async for row in await db.read_iter(...)
+        """
+        logger.info(f'Streaming entries from table: {table} with query: {query} after: {after}')
+        try:
+            await self._ready(table)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error in read_iter: {str(e)}")
+            raise Exception(f"Database error: {str(e)}")
+        statement, params = self._keyset(table, query, after, key, limit)
+        return self._stream(table, statement, params, batch_size)
+
+    async def _stream(self, table: str, statement, params: dict, batch_size: int):
+        count = 0
+        try:
+            async with self.read_engine.connect() as connection:
+                result = await connection.stream(statement, params)
+                names = list(result.keys())
+                async for rows in result.partitions(batch_size):
+                    count += len(rows)
+                    for row in self._convert(table, names, rows):
+                        yield row
+        except SQLAlchemyError as e:
+            logger.error(f"Database error in read_iter: {str(e)}")
+            raise Exception(f"Database error: {str(e)}")
+        logger.success(f'Successfully streamed {count} entries from table: {table}')
+
+    async def read_page(self, table: str, query: dict = None, after=None, key: str = None, limit: int = 100) -> dict:
+        """Coroutine version of DatabaseManager.read_page."""
+        rows = [row async for row in await self.read_iter(table, query, after, key, limit, batch_size=limit)]
+        return self._page(table, rows, key, limit)
+
+    async def update(self, table: str, query: dict = None, data: dict = None) -> str:
+        @self.with_session
+        async def _update(session, table: str, query: dict = None, data: dict = None):
+            logger.info(f'Attempting to update entry in table: {table}')
+
+            if query is None:
+                raise Exception("Query must be provided.")
+
+            if data is None:
+                raise Exception("Data to update must be provided.")
+
+            await self._ready(table)
+            filters, params = self._filters(table, query)
+            item = (await session.execute(self._statement('select', table, filters), params)).first()
+
+            if not item:
+                raise Exception(f"{table.capitalize()} with given parameters not found")
+
+            logger.info(f'Updating entry timestamp.')
+            data['updated'] = datetime.now().strftime('%Y%m%d%H%M%S')
+            data = self._dates_to_timestamp(data)
+
+            statement = self._statement('update', table, filters, frozenset(data))
+            params.update({f'set_{key}': value for key, value in data.items()})
+            self._log_sql(statement, params)
+            await session.execute(statement, params)
+            await session.flush()
+
+            logger.success(f"Successfully updated entry with id: {item.id} in table: {table}.")
+            return str(item.id)
+
+        try:
+            return await _update(table, query, data)
+        finally:
+            self._invalidate(table)
+
+    async def delete(self, table: str, query: dict = None) -> str:
+        @self.with_session
+        async def _delete(session, table: str, query: dict = None):
+            logger.info(f'Attempting to delete entry from table: {table}')
+
+            if query is None:
+                raise Exception("Query must be provided.")
+
+            await self._ready(table)
+            filters, params = self._filters(table, query)
+            item = (await session.execute(self._statement('select', table, filters), params)).first()
+            if not item:
+                raise Exception(f"Entry with given parameters not found in table: {table}.")
+
+            await session.execute(self._statement('delete', table, (('id', 'eq'),)), {'where_id_eq': item.id})
+            await session.flush()
+
+            logger.success(f"Successfully deleted entry with id: {item.id} from table: {table}.")
+            return str(item.id)
+
+        try:
+            return await _delete(table, query)
+        finally:
+            self._invalidate(table)
+
+    async def create_index(self, table: str, columns, unique: bool = False, name: str = None) -> str:
+        """Coroutine version of DatabaseManager.create_index."""
+        await self._ready(table)
+        async with self.engine.begin() as connection:
+            return await connection.run_sync(lambda sync_connection: self._create_index(sync_connection, table, columns, unique, name))
+
+    async def ensure_indexes(self, indexes: dict) -> list:
+        """Coroutine version of DatabaseManager.ensure_indexes."""
+        await self._ready()
+        async with self.engine.begin() as connection:
+            return await connection.run_sync(lambda sync_connection: self._ensure_indexes(sync_connection, indexes))
+
+    async def get_tables(self):
+        logger.info('Attempting to get all tables from database')
+        await self._ready()
+        table_names = self.metadata.tables.keys()
+        logger.success(f'Successfully retrieved {len(table_names)} tables')
+        return list(table_names)
+
+    async def get_schema(self, table: str):
+        await self._ready()
+        return super().get_schema(table)
+
+    async def from_data_object(self, data: dict, table: str, overwrite: bool = False):
+        """Coroutine version of DatabaseManager.from_data_object, a failed import is rolled back before the error response."""
+        @self.with_session
+        async def _from_data_object(session, data: dict, table: str, overwrite: bool):
+            logger.info(f'Attempting to import data to table: {table}')
+            if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+                raise Exception("Data must be a list of dictionaries")
+
+            await self._ready(table)
+            tbl = self._table(table)
+
+            if overwrite:
+                logger.info(f'Truncating table: {table}')
+                await session.execute(tbl.delete())
+
+            if not data:
+                logger.warning(f'No data to import to table: {table}')
+                return {'inserted': 0}
+
+            current_time = datetime.now().strftime('%Y%m%d%H%M%S')
+            for item in data:
+                item['created'] = current_time
+                item['updated'] = current_time
+
+            await session.execute(tbl.insert(), data)
+            await session.flush()
+
+            count = len(data)
+            logger.success(f'Successfully imported {count} records to table: {table}')
+            return {'inserted': count}
+
+        try:
+            return Response(json.dumps(await _from_data_object(data, table, overwrite)), mimetype='application/json')
+        except Exception as e:
+            logger.error(f"Error in from_data_object: {e}")
+            return Response(json.dumps({'error': str(e)}), status=500, mimetype='application/json')
+        finally:
+            self._invalidate(table)
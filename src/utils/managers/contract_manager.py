@@ -0,0 +1,124 @@
+from sqlalchemy import create_engine, MetaData, Table, Column, Text, Float, select, delete
+from sqlalchemy.dialects.sqlite import insert
+from ib_insync import IB, Contract, util
+from src.utils.logger import logger
+from collections import OrderedDict
+import threading
+import json
+import time
+import os
+
+# Qualified contracts kept in memory
+_CAPACITY = 2048
+
+# Contract details are re-qualified after this long, or sooner when IB rejects the contract
+_TTL_SECONDS = 86400
+
+# IB error codes that mean the cached definition is no longer valid
+_STALE_ERROR_CODES = {200, 203}
+
+class ContractManager:
+
+    def __init__(self, ib: IB):
+        """
+        Cache of qualified contracts keyed by (symbol, secType, exchange, currency), in an LRU backed by the cache volume.
+        Qualification is a full IB round trip, so every connector method that takes a contract resolves it here first.
+        """
+        self.ib = ib
+        self.lock = threading.Lock()
+        self.contracts = OrderedDict()
+
+        cache_path = os.getenv('CACHE_PATH', os.path.join(os.path.dirname(__file__), '..', '..', '..', 'cache'))
+        os.makedirs(cache_path, exist_ok=True)
+        self.engine = create_engine(f"sqlite:///{os.path.join(cache_path, 'contracts.db')}")
+        self.metadata = MetaData()
+        self.table = Table(
+            'contracts', self.metadata,
+            Column('key', Text, primary_key=True),
+            Column('contract', Text),
+            Column('qualified', Float),
+        )
+        self.metadata.create_all(self.engine)
+
+        self.ib.errorEvent += self._on_error
+        self._warm()
+
+    def _key(self, contract: Contract) -> str:
+        key = f'{contract.symbol}:{contract.secType}:{contract.exchange}:{contract.currency}'
+        if contract.lastTradeDateOrContractMonth or contract.strike or contract.right:
+            key += f':{contract.lastTradeDateOrContractMonth}:{contract.strike}:{contract.right}'
+        return key
+
+    def _warm(self):
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(self.table)
+                .where(self.table.c.qualified > time.time() - _TTL_SECONDS)
+                .order_by(self.table.c.qualified.desc())
+                .limit(_CAPACITY)
+            ).all()
+        for row in reversed(rows):
+            self.contracts[row.key] = (Contract.create(**json.loads(row.contract)), row.qualified)
+        logger.info(f"Warmed contract cache with {len(rows)} qualified contracts")
+
+    def _on_error(self, reqId: int, errorCode: int, errorString: str, contract: Contract):
+        if contract is None or errorCode not in _STALE_ERROR_CODES:
+            return
+        self.invalidate(contract)
+
+    def invalidate(self, contract: Contract):
+        key = self._key(contract)
+        with self.lock:
+            self.contracts.pop(key, None)
+        with self.engine.begin() as connection:
+            connection.execute(delete(self.table).where(self.table.c.key == key))
+        logger.info(f"Invalidated qualified contract {key}")
+
+    def apply(self, contract: Contract) -> bool:
+        """Fills in the contract from the cache. Returns False when it still has to be qualified."""
+        if contract.conId:
+            return True
+        key = self._key(contract)
+        with self.lock:
+            cached = self.contracts.get(key)
+            if cached is None:
+                return False
+            qualified, timestamp = cached
+            if time.time() - timestamp > _TTL_SECONDS:
+                del self.contracts[key]
+                return False
+            self.contracts.move_to_end(key)
+        util.dataclassUpdate(contract, qualified)
+        return True
+
+    def _store(self, originals: list, contracts: list):
+        now = time.time()
+        rows = []
+        with self.lock:
+            for key, contract in zip(originals, contracts):
+                self.contracts[key] = (Contract.create(**util.dataclassNonDefaults(contract)), now)
+                self.contracts.move_to_end(key)
+                rows.append({'key': key, 'contract': json.dumps(util.dataclassNonDefaults(contract)), 'qualified': now})
+            while len(self.contracts) > _CAPACITY:
+                self.contracts.popitem(last=False)
+
+        statement = insert(self.table)
+        statement = statement.on_conflict_do_update(
+            index_elements=['key'],
+            set_={'contract': statement.excluded.contract, 'qualified': statement.excluded.qualified}
+        )
+        with self.engine.begin() as connection:
+            connection.execute(statement, rows)
+
+    async def qualify(self, *contracts: Contract) -> list:
+        """Qualifies the contracts in place, sending a single batched request for the ones not cached."""
+        misses = [contract for contract in contracts if not self.apply(contract)]
+        if misses:
+            keys = {id(contract): self._key(contract) for contract in misses}
+            logger.info(f"Qualifying {len(misses)} contracts with IBKR")
+            qualified = await self.ib.qualifyContractsAsync(*misses)
+            # Combos have no stable definition to cache
+            qualified = [contract for contract in qualified if contract.secType != 'BAG']
+            if qualified:
+                self._store([keys[id(contract)] for contract in qualified], qualified)
+        return [contract for contract in contracts if contract.conId]
@@ -1,31 +1,137 @@
-from sqlalchemy import create_engine, Table, MetaData
+from sqlalchemy import create_engine, event, Table, MetaData, Index, select, update, delete, bindparam, tuple_
+from sqlalchemy.dialects import sqlite, postgresql
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
+from collections import OrderedDict, Counter
 from functools import wraps
 from flask import jsonify
 from src.utils.logger import logger
 from src.utils.exception import handle_exception
+import pandas as pd
+import threading
+import time
 import re
+import os
 from sqlalchemy import inspect
 
+_TIMESTAMP_FORMAT = '%Y%m%d%H%M%S'
+
+# ISO strings sent by the frontend are stored as timestamps too
+_ISO_FORMAT = '%Y-%m-%dT%H:%M:%S.%fZ'
+
+# Query operators, written as {'column': {'gte': a, 'lt': b}}. A plain value means eq, a list means in
+_OPERATORS = {
+    'eq': lambda column, param: column == param,
+    'ne': lambda column, param: column != param,
+    'gt': lambda column, param: column > param,
+    'gte': lambda column, param: column >= param,
+    'lt': lambda column, param: column < param,
+    'lte': lambda column, param: column <= param,
+    'in': lambda column, param: column.in_(param),
+    'null': lambda column, param: column.is_(None),
+    'notnull': lambda column, param: column.is_not(None),
+    'prefix': None,
+}
+
+# Query keys that shape the result instead of filtering it
+_ORDER_BY = '_order_by'
+_LIMIT = '_limit'
+
+# Rows fetched per round trip by streaming reads
+_BATCH_SIZE = 1000
+
+# Dialects with an INSERT ... ON CONFLICT construct
+_CONFLICT_INSERTS = {'sqlite': sqlite.insert, 'postgresql': postgresql.insert}
+
+# Applied to every SQLite connection the tuned engines open. WAL lets readers run alongside the writer,
+# NORMAL only syncs at checkpoints, and busy_timeout waits for another process's lock instead of failing
+_SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -65536,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+
+# Pooled read connections per process, and how many more a burst may open
+_SQLITE_READERS = 8
+
+# Seconds a write waits for the single writer connection before failing
+_SQLITE_WRITE_TIMEOUT = 30
+
+# Seconds a cached read is served for. Writes through the manager invalidate it sooner,
+# the TTL bounds how stale it gets after writes from other processes
+_CACHE_TTL = 60
+
+# Rendering statements for the log costs more than running them, so it is opt-in
+_LOG_SQL = os.getenv('LOG_SQL', 'false').lower() == 'true'
+
+def _apply_pragmas(engine, pragmas: dict):
+    @event.listens_for(engine, 'connect')
+    def _connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+def sqlite_engines(path: str, readers: int = _SQLITE_READERS) -> tuple:
+    """
+    Returns a (writer, reader) pair of engines on the SQLite file at path, tuned for threaded servers.
+    The writer pools a single connection, so writes in this process queue for it instead of fighting over the file lock,
+    while the reader pools up to 2 * readers query_only connections that read alongside it under WAL.
+    """
+    url = f'sqlite:///{os.path.abspath(path)}'
+    connect_args = {'check_same_thread': False, 'timeout': _SQLITE_PRAGMAS['busy_timeout'] / 1000}
+
+    writer = create_engine(url, poolclass=QueuePool, pool_size=1, max_overflow=0, pool_timeout=_SQLITE_WRITE_TIMEOUT, connect_args=connect_args)
+    _apply_pragmas(writer, {'journal_mode': 'WAL', **_SQLITE_PRAGMAS})
+    reader = create_engine(url, poolclass=QueuePool, pool_size=readers, max_overflow=readers, connect_args=connect_args)
+    _apply_pragmas(reader, {**_SQLITE_PRAGMAS, 'query_only': 'ON'})
+    return writer, reader
+
 class DatabaseManager:
     
-    def __init__(self, base: declarative_base, engine: create_engine):
+    def __init__(self, base: declarative_base, engine: create_engine, read_engine: create_engine = None, cache_size: int = 0, cache_ttl: float = _CACHE_TTL):
         """
         Initialize the DatabaseHandler class.
 
         Args:
             base (declarative_base): The base class for the database models.
-            with_session (function): The function to wrap database operations.
-            db_name (str): The name of the database.
+            engine (Engine): The engine writes, schema changes and reflection go through.
+            read_engine (Engine): The engine reads go through, the same as engine by default.
+            cache_size (int): How many read results to keep in memory, 0 disables the cache.
+            cache_ttl (float): Seconds a cached result is served for.
         """
+        self._setup(base, engine, read_engine, cache_size, cache_ttl)
+        self._initialize(self.engine)
+
+    def _setup(self, base: declarative_base, engine, read_engine, cache_size: int, cache_ttl: float):
+        """Sets the engines and the empty caches, shared with AsyncDatabaseManager, which cannot connect in its constructor."""
         self.engine = engine
+        self.read_engine = read_engine or engine
         self.base = base
-        
+
+        # Reflected tables and built statements, keyed by table and the columns they filter on
+        self.lock = threading.Lock()
+        self.metadata = MetaData()
+        self.tables = {}
+        self.statements = {}
+        self.models = {mapper.class_.__tablename__: mapper.class_ for mapper in self.base.registry.mappers if hasattr(mapper.class_, '__tablename__')}
+
+        # Read results by (table, query), dropped when the table's generation moves past the one they were read at
+        self.cache_lock = threading.Lock()
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.generations = Counter()
+
+    def _initialize(self, bind):
+        """Validates the models against the database, creates the missing tables and reflects them through bind."""
         # First get all tables from the database
-        inspector = inspect(self.engine)
+        inspector = inspect(bind)
         db_tables = inspector.get_table_names()
         
         # Get all models from SQLAlchemy Base
@@ -62,18 +168,220 @@ class DatabaseManager:
                 logger.error(f"Table '{table_name}' has extra columns in model: {extra_cols}")
         
         try:
-            self.base.metadata.create_all(self.engine)
+            self.base.metadata.create_all(bind)
         except Exception as e:
             logger.error(f'Error creating tables: {str(e)}')
 
-        self.metadata = MetaData()
-        self.metadata.reflect(bind=self.engine)
+        self.metadata.reflect(bind=bind)
+        self.tables.update(self.metadata.tables)
         logger.success(f'Database initialized')
 
-    def with_session(self, func):
+    def _table(self, table: str, bind=None) -> Table:
+        """Returns the reflected table, reflecting it through bind (the engine by default) only the first time it is used."""
+        tbl = self.tables.get(table)
+        if tbl is None:
+            with self.lock:
+                tbl = Table(table, self.metadata, autoload_with=bind or self.engine)
+                self.tables[table] = tbl
+        return tbl
+
+    def refresh(self, table: str = None):
+        """Drops cached tables and statements after a schema change, for one table or all of them."""
+        names = [table] if table else list(self.tables)
+        with self.lock:
+            for name in names:
+                tbl = self.tables.pop(name, None)
+                if tbl is not None:
+                    self.metadata.remove(tbl)
+            self.statements = {key: statement for key, statement in self.statements.items() if table and key[1] != table}
+        for name in set(names) | set(self.generations if not table else ()):
+            self._invalidate(name)
+
+    def _normalize(self, value):
+        """Turns a query into a hashable key that does not depend on the order its keys were written in."""
+        if isinstance(value, dict):
+            return tuple(sorted((key, self._normalize(item)) for key, item in value.items()))
+        if isinstance(value, (list, tuple)):
+            return tuple(self._normalize(item) for item in value)
+        hash(value)
+        return value
+
+    def _cached(self, table: str, query: dict) -> tuple:
+        """
+        Returns (key, generation, rows) for a read. rows is None on a miss, and key is None when the cache is off
+        or the query cannot be hashed. The generation is taken before the read, so a write landing during it
+        leaves the stored result already stale.
+        """
+        if not self.cache_size:
+            return None, None, None
+        try:
+            key = (table, self._normalize(query))
+        except TypeError:
+            return None, None, None
+        with self.cache_lock:
+            generation = self.generations[table]
+            entry = self.cache.get(key)
+            if entry is None or entry[0] != generation or entry[1] < time.monotonic():
+                return key, generation, None
+            self.cache.move_to_end(key)
+        # Callers may modify the rows they get, so each gets its own copy
+        return key, generation, [dict(row) for row in entry[2]]
+
+    def _store(self, key: tuple, generation: int, rows: list):
+        if key is None:
+            return
+        with self.cache_lock:
+            if self.generations[key[0]] != generation:
+                return
+            self.cache[key] = (generation, time.monotonic() + self.cache_ttl, [dict(row) for row in rows])
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def _invalidate(self, table: str):
+        """Bumps the table's generation once a write to it has committed, so earlier cached reads are not served again."""
+        with self.cache_lock:
+            self.generations[table] += 1
+
+    def _condition(self, column, op: str):
+        name = f'where_{column.name}_{op}'
+        if op == 'in':
+            return _OPERATORS[op](column, bindparam(name, expanding=True))
+        if op == 'prefix':
+            # A range instead of LIKE, so it is an index range scan and case sensitive on every database
+            return (column >= bindparam(f'{name}_from')) & (column < bindparam(f'{name}_to'))
+        return _OPERATORS[op](column, bindparam(name))
+
+    def _statement(self, kind: str, table: str, filters: tuple, values: frozenset = frozenset(), order: tuple = (), limit: bool = False):
+        """
+        Returns the select, update or delete statement of the table for a filter shape, built once per shape.
+        filters are (column, operator) pairs and order (column, descending) pairs. Filters, values and the limit are bound
+        parameters, so SQLAlchemy's compiled cache also hits on every call after the first.
+        """
+        key = (kind, table, filters, values, order, limit)
+        statement = self.statements.get(key)
+        if statement is None:
+            tbl = self._table(table)
+            where = [self._condition(tbl.c[column], op) for column, op in filters]
+            if kind == 'select':
+                statement = select(tbl).where(*where)
+                if order:
+                    statement = statement.order_by(*(tbl.c[column].desc() if descending else tbl.c[column] for column, descending in order))
+                if limit:
+                    statement = statement.limit(bindparam('limit'))
+            elif kind == 'update':
+                statement = update(tbl).where(*where).values({column: bindparam(f'set_{column}') for column in sorted(values)})
+            else:
+                statement = delete(tbl).where(*where)
+            self.statements[key] = statement
+        return statement
+
+    def _filters(self, table: str, query: dict) -> tuple:
+        """
+        Parses the query into its filter shape and parameters, rejecting keys that are not columns of the table.
+        Values are compared for equality, a list matches any of its values, None matches NULL,
+        and a dict applies operators: eq, ne, gt, gte, lt, lte, in, prefix, null, notnull.
+        null and notnull take True (or None), and False negates them.
+        """
+        tbl = self._table(table)
+        filters = []
+        params = {}
+        for key, value in query.items():
+            if key not in tbl.c:
+                raise Exception(f"Unknown column '{key}' in query for table: {table}")
+            if isinstance(value, dict):
+                conditions = value
+            elif isinstance(value, (list, tuple, set)):
+                conditions = {'in': list(value)}
+            elif value is None:
+                conditions = {'null': None}
+            else:
+                conditions = {'eq': value}
+
+            for op, operand in conditions.items():
+                if op not in _OPERATORS:
+                    raise Exception(f"Unknown operator '{op}' for column '{key}', expected one of {', '.join(_OPERATORS)}")
+                if op in ('null', 'notnull'):
+                    if operand is not None and not isinstance(operand, bool):
+                        raise Exception(f"Operator '{op}' for column '{key}' expects true or false, got {operand!r}")
+                    if operand is False:
+                        op = 'notnull' if op == 'null' else 'null'
+                name = f'where_{key}_{op}'
+                if op == 'prefix':
+                    if not isinstance(operand, str):
+                        raise Exception(f"Operator 'prefix' for column '{key}' expects a string, got {type(operand).__name__}")
+                    if not operand:
+                        continue
+                    params[f'{name}_from'] = operand
+                    params[f'{name}_to'] = operand[:-1] + chr(ord(operand[-1]) + 1)
+                elif op == 'in':
+                    params[name] = list(operand)
+                elif op not in ('null', 'notnull'):
+                    params[name] = operand
+                filters.append((key, op))
+        return tuple(sorted(filters)), params
+
+    def _ordering(self, table: str, query: dict) -> tuple:
+        """Splits the _order_by and _limit keys off the query. _order_by takes a column or a list of them, '-' in front sorts descending."""
+        query = dict(query)
+        order_by = query.pop(_ORDER_BY, None)
+        limit = query.pop(_LIMIT, None)
+
+        tbl = self._table(table)
+        order = []
+        for column in ([order_by] if isinstance(order_by, str) else order_by or []):
+            descending = column.startswith('-')
+            column = column.lstrip('-')
+            if column not in tbl.c:
+                raise Exception(f"Unknown column '{column}' in order by for table: {table}")
+            order.append((column, descending))
+        if limit is not None and (not isinstance(limit, int) or limit < 1):
+            raise Exception(f"Limit must be a positive integer, got {limit}")
+        return query, tuple(order), limit
+
+    def _python_type(self, column):
+        try:
+            return column.type.python_type
+        except NotImplementedError:
+            return None
+
+    def _converters(self, table: str, names: list) -> list:
+        """
+        Picks once per table how each column is converted: ids become strings and 'None' strings become NULL,
+        so rows are converted column by column instead of matching every key of every row.
+        """
+        key = ('converters', table, tuple(names))
+        converters = self.statements.get(key)
+        if converters is None:
+            tbl = self._table(table)
+            converters = []
+            for name in names:
+                numeric = name in tbl.c and self._python_type(tbl.c[name]) in (int, float)
+                if re.match(r'^id$|^\w+_id$', name):
+                    converters.append(lambda value: None if value is None or value == 'None' else str(value))
+                elif numeric:
+                    converters.append(None)
+                else:
+                    converters.append(lambda value: None if value == 'None' else value)
+            self.statements[key] = converters
+        return converters
+
+    def _convert(self, table: str, names: list, rows: list) -> list:
+        columns = list(zip(*rows)) if rows else [()] * len(names)
+        columns = [
+            list(map(converter, column)) if converter else column
+            for converter, column in zip(self._converters(table, names), columns)
+        ]
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def _log_sql(self, statement, params: dict):
+        if _LOG_SQL:
+            logger.info(f'Generated SQL: {statement.compile(dialect=self.engine.dialect)} with {params}')
+
+    def with_session(self, func, engine=None):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            session = Session(bind=self.engine)
+            session = Session(bind=engine or self.engine)
             try:
                 result = func(session, *args, **kwargs)
                 session.commit()
@@ -86,29 +394,76 @@ class DatabaseManager:
                 session.close()
         return wrapper
 
-    def _ids_to_string(self, data: dict):
-        for key, value in data.items():
-            if re.match(r'^id$|^\w+_id$', key):
-                data[key] = str(value)
-        return data
-    
-    def _none_to_null(self, data: dict):
-        for key, value in data.items():
-            if value == 'None':
-                data[key] = None
-        return data
+    def with_read_session(self, func):
+        return self.with_session(func, self.read_engine)
+
+    def _to_timestamp(self, value):
+        if isinstance(value, datetime):
+            return value.strftime(_TIMESTAMP_FORMAT)
+        if isinstance(value, str):
+            try:
+                return datetime.strptime(value, _ISO_FORMAT).strftime(_TIMESTAMP_FORMAT)
+            except ValueError:
+                pass
+        return value
 
     def _dates_to_timestamp(self, data: dict):
         for key, value in data.items():
-            if isinstance(value, datetime):
-                data[key] = value.strftime('%Y%m%d%H%M%S')
-            elif isinstance(value, str):
-                try:
-                    data[key] = datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%fZ').strftime('%Y%m%d%H%M%S')
-                except:
-                    pass
+            data[key] = self._to_timestamp(value)
         return data
 
+    def _column_to_timestamp(self, column: pd.Series) -> pd.Series:
+        """_dates_to_timestamp applied to a whole column at once."""
+        if pd.api.types.is_datetime64_any_dtype(column):
+            return column.dt.strftime(_TIMESTAMP_FORMAT)
+        if column.dtype != object:
+            return column
+        kind = pd.api.types.infer_dtype(column, skipna=True)
+        if kind == 'string':
+            # Only strings ending in Z can be ISO timestamps, the rest of the column is never parsed
+            candidates = column.str.endswith('Z', na=False)
+            if not candidates.any():
+                return column
+            parsed = pd.to_datetime(column[candidates], format=_ISO_FORMAT, errors='coerce').dropna()
+            column = column.copy()
+            column[parsed.index] = parsed.dt.strftime(_TIMESTAMP_FORMAT)
+            return column
+        if kind in ('datetime', 'mixed'):
+            return column.map(self._to_timestamp)
+        return column
+
+    def _records(self, data, tbl: Table) -> list:
+        """
+        Turns a list of dicts or a DataFrame into insert rows, normalizing dates and stamping created and updated column by column.
+        Missing values become NULL. Dicts keep their Python values, and DataFrame columns that pandas turned from integers
+        into floats to hold missing values are cast back for the table's integer columns.
+        """
+        if isinstance(data, pd.DataFrame):
+            frame = data.copy()
+            for column in frame.columns:
+                if column in tbl.c and pd.api.types.is_float_dtype(frame[column]) and self._python_type(tbl.c[column]) is int:
+                    values = frame[column].dropna()
+                    if (values == values.round()).all():
+                        frame[column] = frame[column].astype('Int64')
+        else:
+            frame = pd.DataFrame(list(data), dtype=object)
+        for column in frame.columns:
+            frame[column] = self._column_to_timestamp(frame[column])
+
+        current_time = datetime.now().strftime(_TIMESTAMP_FORMAT)
+        for column in ('created', 'updated'):
+            frame[column] = frame[column].fillna(current_time) if column in frame else current_time
+
+        frame = frame.astype(object).where(frame.notna(), None)
+        columns = list(frame.columns)
+        return [dict(zip(columns, row)) for row in frame.itertuples(index=False, name=None)]
+
+    def _conflict_insert(self, tbl: Table):
+        insert = _CONFLICT_INSERTS.get(self.engine.dialect.name)
+        if insert is None:
+            raise Exception(f"Conflict handling is not supported for {self.engine.dialect.name} databases")
+        return insert(tbl)
+
     def create(self, table: str, data: dict = None) -> str:
         @self.with_session
         def _create(session, table: str, data: dict = None):
@@ -118,11 +473,7 @@ class DatabaseManager:
                 raise Exception("Data to create must be provided.")
             
             # Get the model class for the table
-            model = None
-            for class_ in self.base.__subclasses__():
-                if hasattr(class_, '__tablename__') and class_.__tablename__ == table:
-                    model = class_
-                    break
+            model = self.models.get(table)
             
             if not model:
                 raise Exception(f"Model not found for table: {table}")
@@ -144,43 +495,162 @@ class DatabaseManager:
             logger.success(f'Successfully created entry with id: {new_record.id}')
             return str(new_record.id)
 
-        return _create(table, data)
+        try:
+            return _create(table, data)
+        finally:
+            self._invalidate(table)
 
-    def read(self, table: str, query: dict = None) -> list:
+    def create_many(self, table: str, data=None, ignore_conflicts: bool = False) -> int:
+        """
+        Inserts a list of dicts or a DataFrame into the table with one executemany in a single transaction.
+        With ignore_conflicts, rows that collide with an existing key are skipped instead of failing the batch.
+        """
+        @self.with_session
+        def _create_many(session, table: str, data=None, ignore_conflicts: bool = False):
+            if data is None or len(data) == 0:
+                raise Exception("Data to create must be provided.")
+
+            logger.info(f'Attempting to create {len(data)} entries in table: {table}')
+            tbl = self._table(table)
+            rows = self._records(data, tbl)
+
+            statement = self._conflict_insert(tbl).on_conflict_do_nothing() if ignore_conflicts else tbl.insert()
+            session.execute(statement, rows)
+            session.flush()
+
+            logger.success(f'Successfully created {len(rows)} entries in table: {table}')
+            return len(rows)
+
+        try:
+            return _create_many(table, data, ignore_conflicts)
+        finally:
+            self._invalidate(table)
+
+    def upsert_many(self, table: str, data=None, conflict: list = None, columns: list = None) -> int:
+        """
+        Inserts a list of dicts or a DataFrame, updating the rows that already exist, with one executemany in a single transaction.
+        conflict names the unique columns that identify a row (the primary key by default),
+        columns the ones overwritten on conflict (every column given except created by default).
+        """
         @self.with_session
+        def _upsert_many(session, table: str, data=None, conflict: list = None, columns: list = None):
+            if data is None or len(data) == 0:
+                raise Exception("Data to upsert must be provided.")
+
+            logger.info(f'Attempting to upsert {len(data)} entries in table: {table}')
+            tbl = self._table(table)
+            rows = self._records(data, tbl)
+
+            conflict = conflict or [column.name for column in tbl.primary_key.columns]
+            columns = columns or [column for column in rows[0] if column != 'created']
+            statement = self._conflict_insert(tbl)
+            set_ = {column: statement.excluded[column] for column in columns if column not in conflict}
+            if set_:
+                statement = statement.on_conflict_do_update(index_elements=conflict, set_=set_)
+            else:
+                statement = statement.on_conflict_do_nothing(index_elements=conflict)
+
+            session.execute(statement, rows)
+            session.flush()
+
+            logger.success(f'Successfully upserted {len(rows)} entries in table: {table}')
+            return len(rows)
+
+        try:
+            return _upsert_many(table, data, conflict, columns)
+        finally:
+            self._invalidate(table)
+
+    def read(self, table: str, query: dict = None) -> list:
+        @self.with_read_session
         def _read(session, table: str, query: dict = None):
 
             logger.info(f'Attempting to read entry from table: {table} with query: {query}')
 
             if query is None:
                 raise Exception("Query must be provided.")
-            
-            tbl = Table(table, self.metadata, autoload_with=self.engine)
-            sql_query = session.query(tbl)
-
-            if query:
-                for key, value in query.items():
-                    if hasattr(tbl.c, key):
-                        sql_query = sql_query.filter(getattr(tbl.c, key) == value)
-                
-            # Print the generated SQL query
-            compiled_query = sql_query.statement.compile(
-                compile_kwargs={"literal_binds": True},
-                dialect=self.engine.dialect
-            )
-            logger.info(f'Generated SQL: {str(compiled_query)}')
-            
-            results = sql_query.all()
 
-            serialized_results = [row._asdict() for row in results]
+            query, order, limit = self._ordering(table, query)
+            filters, params = self._filters(table, query)
+            statement = self._statement('select', table, filters, order=order, limit=limit is not None)
+            if limit is not None:
+                params['limit'] = limit
+            self._log_sql(statement, params)
 
-            for result in serialized_results:
-                self._ids_to_string(result)
-                self._none_to_null(result)
+            result = session.execute(statement, params)
+            serialized_results = self._convert(table, list(result.keys()), result.all())
             logger.success(f'Successfully read {len(serialized_results)} entries from table: {table}')
             return serialized_results
 
-        return _read(table, query)
+        key, generation, rows = self._cached(table, query)
+        if rows is not None:
+            return rows
+        rows = _read(table, query)
+        self._store(key, generation, rows)
+        return rows
+
+    def read_iter(self, table: str, query: dict = None, after=None, key: str = None, limit: int = None, batch_size: int = _BATCH_SIZE):
+        """
+        Yields the matching rows in key order without loading them all, fetching batch_size rows per round trip.
+        key is the primary key by default, or a column like created, in which case the primary key breaks ties.
+        after is the cursor to resume from, the key of the last row seen, or [key, primary key] when ordering by another column.
+        The query, key and cursor are checked on the call, before the first row is asked for.
+        """
+        logger.info(f'Streaming entries from table: {table} with query: {query} after: {after}')
+        statement, params = self._keyset(table, query, after, key, limit)
+        return self._stream(table, statement, params, batch_size)
+
+    def _stream(self, table: str, statement, params: dict, batch_size: int):
+        count = 0
+        try:
+            with self.read_engine.connect() as connection:
+                result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(statement, params)
+                names = list(result.keys())
+                for rows in result.partitions():
+                    count += len(rows)
+                    yield from self._convert(table, names, rows)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error in read_iter: {str(e)}")
+            raise Exception(f"Database error: {str(e)}")
+        logger.success(f'Successfully streamed {count} entries from table: {table}')
+
+    def _keyset(self, table: str, query: dict, after, key: str, limit: int) -> tuple:
+        """Builds the select of read_iter, ordered by key and resuming after the cursor."""
+        tbl = self._table(table)
+        primary_key = list(tbl.primary_key.columns)[0]
+        if key and key not in tbl.c:
+            raise Exception(f"Unknown column '{key}' in key for table: {table}")
+        order = tbl.c[key] if key else primary_key
+        if order is not primary_key and after is not None and (not isinstance(after, (list, tuple)) or len(after) != 2):
+            raise Exception(f"Cursor for key '{key}' must be [{key}, {primary_key.name}], got {after}")
+
+        filters, params = self._filters(table, query or {})
+        statement = self._statement('select', table, filters)
+        if order is primary_key:
+            if after is not None:
+                statement = statement.where(order > after)
+            statement = statement.order_by(order)
+        else:
+            if after is not None:
+                statement = statement.where(tuple_(order, primary_key) > tuple_(*after))
+            statement = statement.order_by(order, primary_key)
+        if limit:
+            statement = statement.limit(limit)
+        self._log_sql(statement, params)
+        return statement, params
+
+    def read_page(self, table: str, query: dict = None, after=None, key: str = None, limit: int = 100) -> dict:
+        """Returns one keyset page as {'rows', 'next'}, where next is the after of the following page, or None on the last page."""
+        rows = list(self.read_iter(table, query, after, key, limit, batch_size=limit))
+        return self._page(table, rows, key, limit)
+
+    def _page(self, table: str, rows: list, key: str, limit: int) -> dict:
+        primary_key = list(self._table(table).primary_key.columns)[0].name
+        next_after = None
+        if len(rows) == limit:
+            last = rows[-1]
+            next_after = [last[key], last[primary_key]] if key and key != primary_key else last[primary_key]
+        return {'rows': rows, 'next': next_after}
 
     def update(self, table: str, query: dict = None, data: dict = None) -> str:
         @self.with_session
@@ -193,14 +663,8 @@ class DatabaseManager:
             if data is None:
                 raise Exception("Data to update must be provided.")
 
-            tbl = Table(table, self.metadata, autoload_with=self.engine)
-            sql_query = session.query(tbl)
-
-            for key, value in query.items():
-                if hasattr(tbl.c, key):
-                    sql_query = sql_query.filter(getattr(tbl.c, key) == value)
-
-            item = sql_query.first()
+            filters, params = self._filters(table, query)
+            item = session.execute(self._statement('select', table, filters), params).first()
 
             if not item:
                 raise Exception(f"{table.capitalize()} with given parameters not found")
@@ -209,15 +673,20 @@ class DatabaseManager:
             data['updated'] = datetime.now().strftime('%Y%m%d%H%M%S')
             data = self._dates_to_timestamp(data)
 
-            sql_query.update(data)
+            statement = self._statement('update', table, filters, frozenset(data))
+            params.update({f'set_{key}': value for key, value in data.items()})
+            self._log_sql(statement, params)
+            session.execute(statement, params)
             session.flush()
 
-            updated_item = sql_query.first()
-            logger.success(f"Successfully updated entry with id: {updated_item.id} in table: {table}.")
+            logger.success(f"Successfully updated entry with id: {item.id} in table: {table}.")
             
-            return str(updated_item.id)
+            return str(item.id)
 
-        return _update(table, query, data)
+        try:
+            return _update(table, query, data)
+        finally:
+            self._invalidate(table)
 
     def delete(self, table: str, query: dict = None) -> str:
         @self.with_session
@@ -227,27 +696,59 @@ class DatabaseManager:
             if query is None:
                 raise Exception("Query must be provided.")
             
-            tbl = Table(table, self.metadata, autoload_with=self.engine)
-            sql_query = session.query(tbl)
-
-            if query:
-                for key, value in query.items():
-                    if hasattr(tbl.c, key):
-                        sql_query = sql_query.filter(getattr(tbl.c, key) == value)
-
-            item = sql_query.first()
+            filters, params = self._filters(table, query)
+            item = session.execute(self._statement('select', table, filters), params).first()
             if not item:
                 raise Exception(f"Entry with given parameters not found in table: {table}.")
 
-            delete_stmt = tbl.delete().where(tbl.c.id == item.id)
-            session.execute(delete_stmt)
+            session.execute(self._statement('delete', table, (('id', 'eq'),)), {'where_id_eq': item.id})
             session.flush()
 
             logger.success(f"Successfully deleted entry with id: {item.id} from table: {table}.")
             return str(item.id)
 
-        return _delete(table, query)
+        try:
+            return _delete(table, query)
+        finally:
+            self._invalidate(table)
         
+    def create_index(self, table: str, columns, unique: bool = False, name: str = None) -> str:
+        """Creates an index on one column or a list of them, unless it already exists. Returns the index name."""
+        return self._create_index(self.engine, table, columns, unique, name)
+
+    def _create_index(self, bind, table: str, columns, unique: bool = False, name: str = None) -> str:
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        tbl = self._table(table, bind)
+        for column in columns:
+            if column not in tbl.c:
+                raise Exception(f"Unknown column '{column}' for index on table: {table}")
+
+        name = name or f"ix_{table}_{'_'.join(columns)}"
+        if any(index.name == name for index in tbl.indexes):
+            return name
+        logger.info(f'Creating index {name} on table: {table}')
+        Index(name, *(tbl.c[column] for column in columns), unique=unique).create(bind, checkfirst=True)
+        logger.success(f'Successfully created index {name} on table: {table}')
+        return name
+
+    def ensure_indexes(self, indexes: dict) -> list:
+        """
+        Creates the missing indexes of {table: [column or [columns]]}. Tables not in the database are skipped,
+        so one list can cover every deployment.
+        """
+        return self._ensure_indexes(self.engine, indexes)
+
+    def _ensure_indexes(self, bind, indexes: dict) -> list:
+        existing = set(inspect(bind).get_table_names())
+        names = []
+        for table, entries in indexes.items():
+            if table not in existing:
+                logger.warning(f'Skipping indexes for missing table: {table}')
+                continue
+            for columns in entries:
+                names.append(self._create_index(bind, table, columns))
+        return names
+
     def get_tables(self):
         @self.with_session
         def _get_tables(session):
@@ -297,7 +798,7 @@ class DatabaseManager:
                 if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
                     raise Exception("Data must be a list of dictionaries")
 
-                tbl = Table(table, self.metadata, autoload_with=self.engine)
+                tbl = self._table(table)
 
                 if overwrite:
                     logger.info(f'Truncating table: {table}')
@@ -323,4 +824,7 @@ class DatabaseManager:
                 logger.error(f'Error importing data: {str(e)}')
                 raise Exception(f'Database error: {str(e)}')
 
-        return _from_data_object(data, table, overwrite)
\ No newline at end of file
+        try:
+            return _from_data_object(data, table, overwrite)
+        finally:
+            self._invalidate(table)
@@ -0,0 +1,61 @@
+from src.utils.logger import logger
+import time
+
+# Consecutive request failures (timeouts, dropped connections) that open the circuit
+_FAILURE_THRESHOLD = 3
+
+# Reconnect backoff, doubled on every failed attempt
+_BASE_BACKOFF_SECONDS = 1
+_MAX_BACKOFF_SECONDS = 60
+
+class HealthManager:
+
+    def __init__(self):
+        """
+        Circuit breaker for the IB gateway.
+        While the circuit is open requests fail fast instead of hanging on a dead socket,
+        and reconnect attempts are spaced with exponential backoff.
+        """
+        self.open = False
+        self.failures = 0
+        self.attempts = 0
+        self.next_attempt = 0.0
+
+    def _schedule(self):
+        backoff = min(_BASE_BACKOFF_SECONDS * 2 ** self.attempts, _MAX_BACKOFF_SECONDS)
+        self.next_attempt = time.time() + backoff
+        self.attempts += 1
+
+    def available(self) -> bool:
+        return not self.open
+
+    def ready(self) -> bool:
+        """True when a reconnect may be attempted now."""
+        return time.time() >= self.next_attempt
+
+    def retry_in(self) -> float:
+        return max(self.next_attempt - time.time(), 0.0)
+
+    def success(self):
+        if self.open:
+            logger.success("IBKR gateway is healthy again")
+        self.open = False
+        self.failures = 0
+        self.attempts = 0
+        self.next_attempt = 0.0
+
+    def failure(self):
+        self.failures += 1
+        if not self.open and self.failures >= _FAILURE_THRESHOLD:
+            self.trip()
+
+    def trip(self, *args):
+        """Opens the circuit, also usable as a disconnectedEvent handler."""
+        if not self.open:
+            logger.warning("IBKR gateway unavailable, failing fast until reconnected")
+        self.open = True
+
+    def reconnect_failed(self):
+        self.open = True
+        self._schedule()
+        logger.warning(f"Reconnect to IBKR failed, next attempt in {self.retry_in():.0f}s")
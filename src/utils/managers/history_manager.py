@@ -0,0 +1,205 @@
+from sqlalchemy import create_engine, MetaData, Table, Column, Text, Float, Integer, select
+from sqlalchemy.dialects.sqlite import insert
+from ib_insync import Contract, BarData
+from src.utils.logger import logger
+from datetime import datetime, date, timedelta
+import numpy as np
+import time
+import os
+
+# How long a stored window is served without asking IB for the tail again
+_FRESHNESS_SECONDS = 60
+
+# IB durationStr units expressed as days
+_DURATION_UNITS = {'S': 1 / 86400, 'D': 1, 'W': 7, 'M': 30, 'Y': 365}
+
+# Bar fields and the dtype of their column in columnar reads
+_COLUMNS = {
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'average': np.float64,
+    'barCount': np.int64,
+}
+
+# Longest tail IB accepts as a 'D' duration before we fall back to a full fetch
+_MAX_TAIL_DAYS = 365
+
+class HistoryManager:
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(HistoryManager, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        """
+        On-disk store for historical bars, keyed by contract and bar size.
+        Lives in the cache volume so repeated requests only fetch the missing tail from IB.
+        """
+        if HistoryManager._initialized:
+            return
+
+        logger.announcement('Initializing History Manager', 'info')
+
+        cache_path = os.getenv('CACHE_PATH', os.path.join(os.path.dirname(__file__), '..', '..', '..', 'cache'))
+        os.makedirs(cache_path, exist_ok=True)
+        self.db_path = os.path.join(cache_path, 'history.db')
+        self.engine = create_engine(f'sqlite:///{self.db_path}')
+
+        self.metadata = MetaData()
+        self.bars = Table(
+            'bars', self.metadata,
+            Column('contract', Text, primary_key=True),
+            Column('bar_size', Text, primary_key=True),
+            Column('date', Text, primary_key=True),
+            Column('open', Float),
+            Column('high', Float),
+            Column('low', Float),
+            Column('close', Float),
+            Column('volume', Float),
+            Column('average', Float),
+            Column('barCount', Integer),
+        )
+        self.coverage = Table(
+            'coverage', self.metadata,
+            Column('contract', Text, primary_key=True),
+            Column('bar_size', Text, primary_key=True),
+            Column('start', Text),
+            Column('fetched', Float),
+        )
+        self.metadata.create_all(self.engine)
+
+        logger.announcement('Successfully initialized History Manager', 'success')
+        HistoryManager._initialized = True
+
+    def contract_key(self, contract: Contract) -> str:
+        if contract.conId:
+            return str(contract.conId)
+        return f'{contract.secType}:{contract.symbol}:{contract.exchange}:{contract.currency}'
+
+    def _window_start(self, period: str) -> str:
+        amount, unit = period.split()
+        days = int(amount) * _DURATION_UNITS[unit.upper()]
+        return (datetime.now() - timedelta(days=days)).date().isoformat()
+
+    def _parse_date(self, value: str):
+        if len(value) == 10:
+            return date.fromisoformat(value)
+        return datetime.fromisoformat(value)
+
+    def missing_duration(self, contract: Contract, period: str, bar_size: str):
+        """
+        Returns the durationStr that still has to be requested from IB for this window,
+        or None when the stored bars already cover it and are fresh.
+        """
+        key = self.contract_key(contract)
+        start = self._window_start(period)
+        with self.engine.connect() as connection:
+            coverage = connection.execute(
+                select(self.coverage).where(self.coverage.c.contract == key, self.coverage.c.bar_size == bar_size)
+            ).first()
+            last = connection.execute(
+                select(self.bars.c.date)
+                .where(self.bars.c.contract == key, self.bars.c.bar_size == bar_size)
+                .order_by(self.bars.c.date.desc())
+                .limit(1)
+            ).scalar()
+
+        if coverage is None or last is None or coverage.start > start:
+            return period
+
+        if time.time() - coverage.fetched < _FRESHNESS_SECONDS:
+            return None
+
+        # Refetch the last stored bar too, it may have been incomplete when stored
+        tail_days = (date.today() - date.fromisoformat(last[:10])).days + 1
+        if tail_days > _MAX_TAIL_DAYS:
+            return period
+        return f'{tail_days} D'
+
+    def store(self, contract: Contract, period: str, bar_size: str, bars: list[BarData], full: bool) -> int:
+        """Upserts the fetched bars and extends the covered window."""
+        key = self.contract_key(contract)
+        rows = []
+        for bar in bars:
+            rows.append({
+                'contract': key,
+                'bar_size': bar_size,
+                'date': bar.date.isoformat(),
+                'open': bar.open,
+                'high': bar.high,
+                'low': bar.low,
+                'close': bar.close,
+                'volume': bar.volume,
+                'average': bar.average,
+                'barCount': bar.barCount,
+            })
+
+        with self.engine.begin() as connection:
+            if rows:
+                statement = insert(self.bars)
+                statement = statement.on_conflict_do_update(
+                    index_elements=['contract', 'bar_size', 'date'],
+                    set_={column: statement.excluded[column] for column in _COLUMNS}
+                )
+                connection.execute(statement, rows)
+
+            # A tail fetch keeps the start we already had, a full fetch resets it
+            coverage = {'contract': key, 'bar_size': bar_size, 'start': self._window_start(period), 'fetched': time.time()}
+            statement = insert(self.coverage).values(**coverage)
+            set_ = {'fetched': statement.excluded.fetched}
+            if full:
+                set_['start'] = statement.excluded.start
+            connection.execute(statement.on_conflict_do_update(index_elements=['contract', 'bar_size'], set_=set_))
+
+        logger.info(f'Stored {len(rows)} bars for {key} ({bar_size})')
+        return len(rows)
+
+    def read(self, contract: Contract, period: str, bar_size: str) -> list:
+        """Returns the stored bars of the window in the same shape as BarData.dict()."""
+        key = self.contract_key(contract)
+        start = self._window_start(period)
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(self.bars)
+                .where(self.bars.c.contract == key, self.bars.c.bar_size == bar_size, self.bars.c.date >= start)
+                .order_by(self.bars.c.date)
+            ).mappings().all()
+
+        bars = []
+        for row in rows:
+            bar = dict(row)
+            del bar['contract']
+            del bar['bar_size']
+            bar['date'] = self._parse_date(bar['date'])
+            bars.append(bar)
+        return bars
+
+    def read_columns(self, contract: Contract, period: str, bar_size: str) -> dict:
+        """
+        Returns the stored bars of the window as one contiguous NumPy array per field.
+        Rows are transposed straight into the arrays, no per-bar dict is ever built.
+        """
+        key = self.contract_key(contract)
+        start = self._window_start(period)
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                select(self.bars.c.date, *(self.bars.c[column] for column in _COLUMNS))
+                .where(self.bars.c.contract == key, self.bars.c.bar_size == bar_size, self.bars.c.date >= start)
+                .order_by(self.bars.c.date)
+            ).all()
+
+        count = len(rows)
+        values = list(zip(*rows)) if rows else [()] * (len(_COLUMNS) + 1)
+
+        # Daily and longer bars are stored as dates, intraday bars as datetimes
+        unit = 'D' if count and len(values[0][0]) == 10 else 's'
+        columns = {'date': np.array(values[0], dtype=f'datetime64[{unit}]')}
+        for (column, dtype), value in zip(_COLUMNS.items(), values[1:]):
+            columns[column] = np.fromiter(value, dtype=dtype, count=count)
+        return columns
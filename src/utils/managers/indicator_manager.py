@@ -0,0 +1,163 @@
+from numpy.lib.stride_tricks import sliding_window_view
+from src.utils.logger import logger
+from collections import OrderedDict
+import numpy as np
+import threading
+
+# Window used when an indicator is requested without one, e.g. 'rsi' instead of 'rsi:14'
+_DEFAULT_WINDOWS = {
+    'sma': 20,
+    'ema': 20,
+    'rsi': 14,
+    'atr': 14,
+    'volatility': 20,
+    'returns': 1,
+}
+
+# Aligned symbol sets kept in memory, each with the indicators computed on it so far
+_CAPACITY = 64
+
+def _shift(matrix: np.ndarray, periods: int) -> np.ndarray:
+    shifted = np.full_like(matrix, np.nan)
+    shifted[:, periods:] = matrix[:, :-periods]
+    return shifted
+
+def _rolling(matrix: np.ndarray, window: int, reduce) -> np.ndarray:
+    """Applies reduce over every trailing window of every row. A window holding a NaN yields NaN."""
+    result = np.full_like(matrix, np.nan)
+    if matrix.shape[1] >= window:
+        result[:, window - 1:] = reduce(sliding_window_view(matrix, window, axis=1), axis=-1)
+    return result
+
+def _ewm(matrix: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponentially weighted mean along time, seeded with each row's first value.
+    The recursion runs over time only, every step updates all symbols at once.
+    """
+    result = np.empty_like(matrix)
+    previous = np.full(matrix.shape[0], np.nan)
+    for t in range(matrix.shape[1]):
+        value = matrix[:, t]
+        step = alpha * value + (1 - alpha) * previous
+        # Rows that have not started yet take the value as it is, rows with a gap carry the last mean
+        step = np.where(np.isnan(previous), value, step)
+        previous = np.where(np.isnan(value), previous, step)
+        result[:, t] = previous
+    return result
+
+def _warm_up(matrix: np.ndarray, window: int) -> np.ndarray:
+    matrix[:, :window] = np.nan
+    return matrix
+
+def _sma(frame: dict, window: int) -> np.ndarray:
+    return _rolling(frame['close'], window, np.mean)
+
+def _ema(frame: dict, window: int) -> np.ndarray:
+    return _ewm(frame['close'], 2 / (window + 1))
+
+def _rsi(frame: dict, window: int) -> np.ndarray:
+    change = np.diff(frame['close'], axis=1, prepend=np.nan)
+    gain = _ewm(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), 1 / window)
+    loss = _ewm(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), 1 / window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + gain / loss)
+    rsi = np.where(loss == 0, 100.0, rsi)
+    rsi[np.isnan(gain)] = np.nan
+    return _warm_up(rsi, window)
+
+def _atr(frame: dict, window: int) -> np.ndarray:
+    previous = _shift(frame['close'], 1)
+    true_range = np.fmax(
+        frame['high'] - frame['low'],
+        np.fmax(np.abs(frame['high'] - previous), np.abs(frame['low'] - previous))
+    )
+    return _warm_up(_ewm(true_range, 1 / window), window)
+
+def _returns(frame: dict, window: int) -> np.ndarray:
+    return frame['close'] / _shift(frame['close'], window) - 1
+
+def _volatility(frame: dict, window: int) -> np.ndarray:
+    """Standard deviation of the log returns over the window, per bar and not annualized."""
+    log_returns = np.log(frame['close'] / _shift(frame['close'], 1))
+    return _rolling(log_returns, window, lambda windows, axis: np.std(windows, axis=axis, ddof=1))
+
+def align(columns: dict, fields: tuple = ('close', 'high', 'low')) -> dict:
+    """
+    Builds aligned (symbols x time) matrices of the fields from {symbol: columnar bars}.
+    Rows follow the sorted symbols and columns the union of bar dates, a symbol with no bar at a date gets NaN there.
+    """
+    symbols = sorted(columns)
+    dates = np.unique(np.concatenate([columns[symbol]['date'] for symbol in symbols]))
+    frame = {'symbols': symbols, 'dates': dates}
+    for field in fields:
+        frame[field] = np.full((len(symbols), len(dates)), np.nan)
+    for row, symbol in enumerate(symbols):
+        positions = np.searchsorted(dates, columns[symbol]['date'])
+        for field in fields:
+            frame[field][row, positions] = columns[symbol][field]
+    return frame
+
+_INDICATORS = {
+    'sma': _sma,
+    'ema': _ema,
+    'rsi': _rsi,
+    'atr': _atr,
+    'volatility': _volatility,
+    'returns': _returns,
+}
+
+class IndicatorManager:
+
+    def __init__(self):
+        """
+        Technical indicators computed with NumPy over an aligned (symbols x time) price matrix.
+        Results are cached per symbol set and last bar, so repeated loads of the same dashboard skip the math.
+        """
+        self.lock = threading.Lock()
+        self.frames = OrderedDict()
+
+    def parse(self, indicator: str) -> tuple:
+        """Parses 'name' or 'name:window' into (name, window), rejecting unknown indicators."""
+        name, _, window = indicator.partition(':')
+        name = name.strip().lower()
+        if name not in _INDICATORS:
+            raise Exception(f"Unknown indicator '{name}', expected one of {', '.join(_INDICATORS)}.")
+        window = int(window) if window else _DEFAULT_WINDOWS[name]
+        if window < 1:
+            raise Exception(f"Indicator window must be positive, got {window} for '{name}'.")
+        return name, window
+
+    def compute(self, columns: dict, indicators: list, period: str) -> dict:
+        """Returns {indicator: {symbol: values}} for the requested indicators, along with the aligned dates."""
+        specs = {indicator: self.parse(indicator) for indicator in indicators}
+        if not columns:
+            return {'dates': [], 'indicators': {indicator: {} for indicator in specs}}
+
+        end = max(columns[symbol]['date'][-1] for symbol in columns if len(columns[symbol]['date']))
+        key = (tuple(sorted(columns)), period, str(end))
+        # The last bar of the day keeps changing until the session closes
+        last = tuple(float(columns[symbol]['close'][-1]) for symbol in key[0] if len(columns[symbol]['close']))
+
+        with self.lock:
+            cached = self.frames.get(key)
+            if cached is None or cached['last'] != last:
+                cached = {'last': last, 'frame': align(columns), 'values': {}}
+                self.frames[key] = cached
+                logger.info(f"Aligned {len(key[0])} symbols up to {end}")
+            self.frames.move_to_end(key)
+            while len(self.frames) > _CAPACITY:
+                self.frames.popitem(last=False)
+
+        frame = cached['frame']
+        values = cached['values']
+        for name, window in set(specs.values()):
+            if (name, window) not in values:
+                values[(name, window)] = _INDICATORS[name](frame, window)
+
+        return {
+            'dates': frame['dates'],
+            'indicators': {
+                indicator: {symbol: values[spec][row] for row, symbol in enumerate(frame['symbols'])}
+                for indicator, spec in specs.items()
+            },
+        }
@@ -0,0 +1,368 @@
+from sqlalchemy import create_engine, Column, Text, Integer, Float, Index, select, func
+from sqlalchemy.ext.declarative import declarative_base
+from ib_insync import IB, Trade, Fill, CommissionReport, OrderStatus
+from src.utils.managers.database_manager import DatabaseManager
+from src.utils.encoder import encode
+from src.utils.logger import logger
+from datetime import datetime, timezone
+import itertools
+import threading
+import atexit
+import orjson
+import os
+
+# Buffered events are written at least this often, or as soon as a batch fills up
+_FLUSH_SECONDS = 1
+_BATCH_SIZE = 500
+
+Base = declarative_base()
+
+class OrderEvent(Base):
+    __tablename__ = 'order_events'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created = Column(Text)
+    updated = Column(Text)
+    seq = Column(Integer, nullable=False)
+    order_key = Column(Text, nullable=False)
+    orderId = Column(Integer)
+    permId = Column(Integer)
+    clientId = Column(Integer)
+    conId = Column(Integer)
+    symbol = Column(Text)
+    account = Column(Text)
+    status = Column(Text)
+    filled = Column(Float)
+    remaining = Column(Float)
+    avgFillPrice = Column(Float)
+    time = Column(Text)
+    trade = Column(Text)
+    __table_args__ = (
+        Index('ix_order_events_order_key', 'order_key', 'id'),
+        Index('ix_order_events_seq', 'seq'),
+        Index('ix_order_events_orderId', 'orderId'),
+        Index('ix_order_events_conId', 'conId'),
+        Index('ix_order_events_time', 'time'),
+    )
+
+class OrderState(Base):
+    """The latest event of every order, upserted with each batch so lookups do not group the whole journal."""
+    __tablename__ = 'order_states'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created = Column(Text)
+    updated = Column(Text)
+    seq = Column(Integer, nullable=False)
+    order_key = Column(Text, nullable=False, unique=True)
+    orderId = Column(Integer)
+    permId = Column(Integer)
+    clientId = Column(Integer)
+    conId = Column(Integer)
+    symbol = Column(Text)
+    account = Column(Text)
+    status = Column(Text)
+    filled = Column(Float)
+    remaining = Column(Float)
+    avgFillPrice = Column(Float)
+    time = Column(Text)
+    trade = Column(Text)
+    __table_args__ = (
+        Index('ix_order_states_orderId', 'orderId', 'seq'),
+        Index('ix_order_states_status', 'status', 'seq'),
+        Index('ix_order_states_seq', 'seq'),
+    )
+
+class ExecutionRecord(Base):
+    __tablename__ = 'executions'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created = Column(Text)
+    updated = Column(Text)
+    seq = Column(Integer, nullable=False)
+    execId = Column(Text, nullable=False)
+    orderId = Column(Integer)
+    permId = Column(Integer)
+    conId = Column(Integer)
+    symbol = Column(Text)
+    account = Column(Text)
+    side = Column(Text)
+    shares = Column(Float)
+    price = Column(Float)
+    time = Column(Text)
+    fill = Column(Text)
+    __table_args__ = (
+        Index('ix_executions_execId', 'execId'),
+        Index('ix_executions_seq', 'seq'),
+        Index('ix_executions_orderId', 'orderId'),
+        Index('ix_executions_conId', 'conId'),
+        Index('ix_executions_time', 'time'),
+    )
+
+class CommissionRecord(Base):
+    __tablename__ = 'commissions'
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    created = Column(Text)
+    updated = Column(Text)
+    seq = Column(Integer, nullable=False)
+    execId = Column(Text, nullable=False)
+    commission = Column(Float)
+    currency = Column(Text)
+    realizedPNL = Column(Float)
+    __table_args__ = (
+        Index('ix_commissions_execId', 'execId'),
+        Index('ix_commissions_seq', 'seq'),
+    )
+
+def _order_key(trade: Trade) -> str:
+    # Orders placed from TWS or another session carry no API orderId, only a permId
+    if trade.order.orderId > 0:
+        return f'{trade.order.clientId}:{trade.order.orderId}'
+    return f'perm:{trade.order.permId}'
+
+def _timestamp(value: datetime) -> str:
+    return (value or datetime.now(timezone.utc)).strftime('%Y%m%d%H%M%S')
+
+class JournalManager:
+
+    def __init__(self, ib: IB):
+        """
+        Append-only journal of order status changes, executions and commission reports, kept in SQLite through the DatabaseManager.
+        Events are buffered and written in batches, and order lookups read the journal instead of asking IB,
+        so they stay available while the gateway is down.
+        """
+        self.ib = ib
+        cache_path = os.getenv('CACHE_PATH', os.path.join(os.path.dirname(__file__), '..', '..', '..', 'cache'))
+        os.makedirs(cache_path, exist_ok=True)
+        self.engine = create_engine(f"sqlite:///{os.path.join(cache_path, 'journal.db')}")
+        self.db = DatabaseManager(base=Base, engine=self.engine)
+
+        self.lock = threading.Lock()
+        # Held for a whole flush, so batches reach the journal in the order their events arrived
+        self.write_lock = threading.Lock()
+        self.buffers = {table: [] for table in Base.metadata.tables}
+
+        # One sequence across all tables, numbered as events arrive, is the cursor of incremental syncs
+        with self.engine.connect() as connection:
+            last = max(connection.execute(select(func.max(table.c.seq))).scalar() or 0 for table in Base.metadata.tables.values())
+        self.sequence = itertools.count(last + 1)
+        self._sync_states()
+
+        self.wake = threading.Event()
+        self.thread = threading.Thread(target=self._writer, name='journal-writer', daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+        self.ib.orderStatusEvent += self.record_status
+        self.ib.execDetailsEvent += self.record_execution
+        self.ib.commissionReportEvent += self.record_commission
+        self.ib.connectedEvent += self._on_connected
+
+    def _append(self, table: str, row: dict):
+        with self.lock:
+            row['seq'] = next(self.sequence)
+            self.buffers[table].append(row)
+            full = len(self.buffers[table]) >= _BATCH_SIZE
+        if full:
+            self.wake.set()
+
+    def _sync_states(self):
+        """Brings order_states up to the events, for journals written before it existed or stopped between the two writes."""
+        orders = OrderEvent.__table__
+        states = OrderState.__table__
+        with self.engine.connect() as connection:
+            last = connection.execute(select(func.max(states.c.seq))).scalar() or 0
+            latest = select(func.max(orders.c.id)).where(orders.c.seq > last).group_by(orders.c.order_key)
+            columns = [orders.c[column.name] for column in states.c if column.name != 'id']
+            rows = connection.execute(select(*columns).where(orders.c.id.in_(latest))).mappings().all()
+        if rows:
+            self.db.upsert_many('order_states', [dict(row) for row in rows], conflict=['order_key'])
+            logger.info(f"Caught up the state of {len(rows)} journaled orders")
+
+    def _writer(self):
+        while True:
+            self.wake.wait(_FLUSH_SECONDS)
+            self.wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error writing order journal: {str(e)}")
+
+    def _write(self):
+        with self.lock:
+            buffers = {table: rows for table, rows in self.buffers.items() if rows}
+            self.buffers = {table: [] for table in self.buffers}
+        for table, rows in buffers.items():
+            self.db.create_many(table, rows)
+        if 'order_events' in buffers:
+            # Events are in arrival order, so the last one of each order is its state
+            latest = {row['order_key']: row for row in buffers['order_events']}
+            self.db.upsert_many('order_states', list(latest.values()), conflict=['order_key'])
+
+    def flush(self):
+        """Writes every buffered event, one batched insert per table."""
+        with self.write_lock:
+            self._write()
+
+    def _status_row(self, trade: Trade) -> dict:
+        return {
+            'order_key': _order_key(trade),
+            'orderId': trade.order.orderId,
+            'permId': trade.order.permId,
+            'clientId': trade.order.clientId,
+            'conId': trade.contract.conId,
+            'symbol': trade.contract.symbol,
+            'account': trade.order.account,
+            'status': trade.orderStatus.status,
+            'filled': trade.orderStatus.filled,
+            'remaining': trade.orderStatus.remaining,
+            'avgFillPrice': trade.orderStatus.avgFillPrice,
+            'time': _timestamp(trade.log[-1].time if trade.log else None),
+            'trade': encode({'contract': trade.contract, 'order': trade.order, 'orderStatus': trade.orderStatus}).decode(),
+        }
+
+    def _execution_row(self, fill: Fill) -> dict:
+        execution = fill.execution
+        return {
+            'execId': execution.execId,
+            'orderId': execution.orderId,
+            'permId': execution.permId,
+            'conId': fill.contract.conId,
+            'symbol': fill.contract.symbol,
+            'account': execution.acctNumber,
+            'side': execution.side,
+            'shares': execution.shares,
+            'price': execution.price,
+            'time': _timestamp(execution.time),
+            'fill': encode({'contract': fill.contract, 'execution': execution}).decode(),
+        }
+
+    def record_status(self, trade: Trade):
+        self._append('order_events', self._status_row(trade))
+
+    def record_execution(self, trade: Trade, fill: Fill):
+        self._append('executions', self._execution_row(fill))
+
+    def record_commission(self, trade: Trade, fill: Fill, report: CommissionReport):
+        self._append('commissions', {
+            'execId': report.execId,
+            'commission': report.commission,
+            'currency': report.currency,
+            'realizedPNL': report.realizedPNL,
+        })
+
+    def _on_connected(self):
+        # Orders and fills that changed while we were disconnected arrive with the startup sync, not as events
+        try:
+            self.backfill(self.ib.trades(), self.ib.fills())
+        except Exception as e:
+            logger.error(f"Error backfilling order journal: {str(e)}")
+
+    def backfill(self, trades: list, fills: list):
+        """Records trades and fills IB already knew about, skipping statuses and executions the journal holds."""
+        self.flush()
+        orders = OrderEvent.__table__
+        executions = ExecutionRecord.__table__
+        with self.engine.connect() as connection:
+            known_statuses = set(connection.execute(
+                select(orders.c.order_key, orders.c.status).where(orders.c.order_key.in_({_order_key(trade) for trade in trades}))
+            ).all())
+            known_executions = set(connection.execute(
+                select(executions.c.execId).where(executions.c.execId.in_({fill.execution.execId for fill in fills}))
+            ).scalars())
+
+        for trade in trades:
+            if (_order_key(trade), trade.orderStatus.status) not in known_statuses:
+                self.record_status(trade)
+        for fill in fills:
+            if fill.execution.execId not in known_executions:
+                self._append('executions', self._execution_row(fill))
+                if fill.commissionReport.execId:
+                    self.record_commission(None, fill, fill.commissionReport)
+        self.flush()
+
+    def _latest_orders(self, states: set, start: str = None, end: str = None) -> list:
+        orders = OrderState.__table__
+        query = select(orders.c.trade).where(orders.c.status.in_(states))
+        if start:
+            query = query.where(orders.c.time >= start)
+        if end:
+            query = query.where(orders.c.time <= end)
+        self.flush()
+        with self.engine.connect() as connection:
+            rows = connection.execute(query.order_by(orders.c.seq)).scalars().all()
+        return [orjson.loads(row) for row in rows]
+
+    def order_status(self, orderId: int):
+        """Returns the latest journaled status of the order, or None when it was never seen."""
+        orders = OrderState.__table__
+        self.flush()
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                select(orders.c.trade).where(orders.c.orderId == orderId).order_by(orders.c.seq.desc()).limit(1)
+            ).scalar()
+        return orjson.loads(row)['orderStatus'] if row else None
+
+    def open_orders(self) -> list:
+        return self._latest_orders(OrderStatus.ActiveStates)
+
+    def completed_orders(self, start: str = None, end: str = None) -> list:
+        return self._latest_orders(OrderStatus.DoneStates, start, end)
+
+    def _load_fills(self, connection, query) -> list:
+        executions = ExecutionRecord.__table__
+        commissions = CommissionRecord.__table__
+        rows = connection.execute(query.order_by(executions.c.id)).all()
+        exec_ids = {row.execId for row in rows}
+        reports = connection.execute(
+            select(commissions).where(commissions.c.execId.in_(exec_ids)).order_by(commissions.c.id)
+        ).mappings().all() if exec_ids else []
+
+        reports = {report['execId']: {key: report[key] for key in ('execId', 'commission', 'currency', 'realizedPNL')} for report in reports}
+        # A fill is sent again after a reconnect, the latest copy wins
+        fills = {}
+        for row in rows:
+            fill = orjson.loads(row.fill)
+            fill['commissionReport'] = reports.get(row.execId)
+            fills[row.execId] = fill
+        return list(fills.values())
+
+    def executions(self, orderId: int = None, conId: int = None, symbol: str = None, start: str = None, end: str = None) -> list:
+        """Returns the journaled fills matching every given filter, with their commission report when one arrived."""
+        executions = ExecutionRecord.__table__
+        query = select(executions.c.execId, executions.c.fill)
+        if orderId is not None:
+            query = query.where(executions.c.orderId == orderId)
+        if conId:
+            query = query.where(executions.c.conId == conId)
+        elif symbol:
+            query = query.where(executions.c.symbol == symbol)
+        if start:
+            query = query.where(executions.c.time >= start)
+        if end:
+            query = query.where(executions.c.time <= end)
+
+        self.flush()
+        with self.engine.connect() as connection:
+            return self._load_fills(connection, query)
+
+    def changes(self, since: int) -> dict:
+        """
+        Returns the orders completed and the fills added or given a commission report after the cursor, with the next cursor.
+        Runs under the write lock, so no batch can land between reading the rows and reading the cursor.
+        """
+        orders = OrderEvent.__table__
+        executions = ExecutionRecord.__table__
+        commissions = CommissionRecord.__table__
+
+        changed = select(orders.c.order_key).where(orders.c.seq > since)
+        latest = select(func.max(orders.c.id)).where(orders.c.order_key.in_(changed)).group_by(orders.c.order_key)
+        order_query = select(orders.c.trade).where(orders.c.id.in_(latest), orders.c.status.in_(OrderStatus.DoneStates))
+        fill_query = select(executions.c.execId, executions.c.fill).where(
+            (executions.c.seq > since) | executions.c.execId.in_(select(commissions.c.execId).where(commissions.c.seq > since))
+        )
+
+        with self.write_lock:
+            self._write()
+            with self.engine.connect() as connection:
+                cursor = max(connection.execute(select(func.max(table.c.seq))).scalar() or 0 for table in Base.metadata.tables.values())
+                rows = connection.execute(order_query.order_by(orders.c.id)).scalars().all()
+                fills = self._load_fills(connection, fill_query)
+
+        return {'orders': [orjson.loads(row) for row in rows], 'fills': fills, 'cursor': max(cursor, since)}
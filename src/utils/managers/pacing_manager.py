@@ -0,0 +1,73 @@
+from src.utils.logger import logger
+from typing import Awaitable, Callable
+from collections import deque
+import asyncio
+import time
+
+# IB historical data pacing rules
+_MAX_REQUESTS = 60
+_WINDOW_SECONDS = 600
+_IDENTICAL_SECONDS = 15
+_MAX_SAME_CONTRACT = 6
+_SAME_CONTRACT_SECONDS = 2
+_MAX_CONCURRENT = 50
+
+class PacingManager:
+
+    def __init__(self):
+        """
+        Schedules historical data requests so they never trip IB's pacing violations:
+        no identical request within 15 seconds, no more than 6 requests for the same
+        contract within 2 seconds, no more than 60 requests in any 10 minute window
+        and no more than 50 requests in flight.
+        """
+        self.requests = deque()
+        self.identical = {}
+        self.contracts = {}
+        self.semaphore = None
+
+    def _wait_time(self, request_key: tuple, contract_key: str, now: float) -> float:
+        while self.requests and now - self.requests[0] >= _WINDOW_SECONDS:
+            self.requests.popleft()
+
+        wait = 0.0
+        if len(self.requests) >= _MAX_REQUESTS:
+            wait = max(wait, self.requests[0] + _WINDOW_SECONDS - now)
+
+        last_identical = self.identical.get(request_key)
+        if last_identical is not None:
+            wait = max(wait, last_identical + _IDENTICAL_SECONDS - now)
+
+        same_contract = self.contracts.setdefault(contract_key, deque())
+        while same_contract and now - same_contract[0] >= _SAME_CONTRACT_SECONDS:
+            same_contract.popleft()
+        if len(same_contract) >= _MAX_SAME_CONTRACT:
+            wait = max(wait, same_contract[0] + _SAME_CONTRACT_SECONDS - now)
+
+        return wait
+
+    async def acquire(self, request_key: tuple, contract_key: str):
+        """Waits until the request can be sent without a pacing violation and records it."""
+        while True:
+            now = time.time()
+            wait = self._wait_time(request_key, contract_key, now)
+            if wait <= 0:
+                break
+            logger.info(f"Pacing historical request {request_key} for {wait:.1f}s")
+            await asyncio.sleep(wait)
+
+        self.requests.append(now)
+        self.identical[request_key] = now
+        self.contracts[contract_key].append(now)
+
+        # Drop identical request markers that can no longer cause a wait
+        for key in [key for key, sent in self.identical.items() if now - sent >= _IDENTICAL_SECONDS]:
+            del self.identical[key]
+
+    async def run(self, request_key: tuple, contract_key: str, request: Callable[[], Awaitable]):
+        """Runs a historical data request once pacing allows and a request slot is free."""
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(_MAX_CONCURRENT)
+        async with self.semaphore:
+            await self.acquire(request_key, contract_key)
+            return await request()
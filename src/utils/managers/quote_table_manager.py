@@ -0,0 +1,119 @@
+from src.utils.logger import logger
+import numpy as np
+import tempfile
+import time
+import os
+
+_DTYPE = np.dtype([
+    ('seq', '<u8'),
+    ('symbol', 'S16'),
+    ('last', '<f8'),
+    ('bid', '<f8'),
+    ('ask', '<f8'),
+    ('bidSize', '<f8'),
+    ('askSize', '<f8'),
+    ('updated', '<f8'),
+])
+
+_FIELDS = ('last', 'bid', 'ask', 'bidSize', 'askSize')
+
+# Comfortably above the number of market data lines we can hold
+_SLOTS = 1024
+
+# Quotes older than this are left to the IB connector to refresh
+_MAX_AGE_SECONDS = 60
+
+# Reads give up after this many torn attempts and fall back to IB
+_MAX_RETRIES = 100
+
+def _default_path() -> str:
+    directory = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.path.join(directory, 'ibkr-quotes')
+
+class QuoteTableManager:
+
+    def __init__(self, writer: bool = False):
+        """
+        Fixed-layout table of the latest quote per subscribed symbol, memory-mapped so every worker reads it without touching IB.
+        Only the process that owns the IB connection writes, and each row carries a seqlock
+        (odd while a write is in progress) so readers detect torn rows and retry instead of locking.
+        """
+        self.path = os.getenv('IBKR_QUOTE_TABLE') or _default_path()
+        self.writer = writer
+        self.table = None
+        self.slots = {}
+        if writer:
+            self.table = np.memmap(self.path, dtype=_DTYPE, mode='w+', shape=(_SLOTS,))
+            self.table[:] = np.zeros(_SLOTS, dtype=_DTYPE)
+            self.table.flush()
+            logger.info(f"Publishing quotes to {self.path}")
+
+    def _open(self) -> bool:
+        if self.table is not None:
+            return True
+        if not os.path.exists(self.path):
+            return False
+        self.table = np.memmap(self.path, dtype=_DTYPE, mode='r', shape=(_SLOTS,))
+        return True
+
+    def _writer_slot(self, symbol: bytes) -> int:
+        slot = self.slots.get(symbol)
+        if slot is not None:
+            return slot
+        if len(self.slots) < _SLOTS:
+            slot = len(self.slots)
+        else:
+            # Reuse the row that has gone the longest without an update
+            slot = int(np.argmin(self.table['updated']))
+            del self.slots[self.table['symbol'][slot]]
+        self.slots[symbol] = slot
+        return slot
+
+    def publish(self, tickers: set):
+        """Writes the latest fields of every updated ticker, meant to be connected to pendingTickersEvent."""
+        now = time.time()
+        seq = self.table['seq']
+        for ticker in tickers:
+            symbol = ticker.contract.symbol.encode()
+            slot = self._writer_slot(symbol)
+            seq[slot] += 1
+            self.table['symbol'][slot] = symbol
+            for field in _FIELDS:
+                self.table[field][slot] = getattr(ticker, field)
+            self.table['updated'][slot] = now
+            seq[slot] += 1
+
+    def _reader_slot(self, symbol: bytes):
+        slot = self.slots.get(symbol)
+        if slot is not None and self.table['symbol'][slot] == symbol:
+            return slot
+        matches = np.flatnonzero(self.table['symbol'] == symbol)
+        if not len(matches):
+            self.slots.pop(symbol, None)
+            return None
+        self.slots[symbol] = int(matches[0])
+        return self.slots[symbol]
+
+    def read(self, symbol: str):
+        """Returns the latest quote for the symbol, or None when it isn't published or is too old."""
+        if not self._open():
+            return None
+        key = symbol.encode()
+        slot = self._reader_slot(key)
+        if slot is None:
+            return None
+
+        seq = self.table['seq']
+        for _ in range(_MAX_RETRIES):
+            before = seq[slot]
+            if before % 2:
+                continue
+            row = self.table[slot].copy()
+            if seq[slot] == before:
+                break
+        else:
+            return None
+
+        if row['symbol'] != key or time.time() - row['updated'] > _MAX_AGE_SECONDS or np.isnan(row['last']):
+            return None
+        return {field: float(row[field]) for field in _FIELDS}
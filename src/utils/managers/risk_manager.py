@@ -0,0 +1,107 @@
+from src.utils.managers.indicator_manager import align
+from src.utils.logger import logger
+from statistics import NormalDist
+from typing import Callable
+import numpy as np
+import threading
+
+class RiskManager:
+
+    def __init__(self, details: Callable[[list], list]):
+        """
+        Portfolio risk computed with NumPy from positions and the stored daily bars.
+        The result is kept until the positions or the latest bar change, and sectors are looked up once per contract.
+        """
+        self.details = details
+        self.lock = threading.Lock()
+        self.sectors = {}
+        self.results = {}
+
+    def _sectors(self, contracts: list) -> list:
+        missing = [contract for contract in contracts if contract.conId not in self.sectors]
+        if missing:
+            for contract, details in zip(missing, self.details(missing)):
+                self.sectors[contract.conId] = (details.industry if details else None) or 'Unknown'
+        return [self.sectors[contract.conId] for contract in contracts]
+
+    def _exposure(self, labels: list, values: np.ndarray) -> dict:
+        keys, groups = np.unique(np.array(labels), return_inverse=True)
+        net = np.bincount(groups, weights=values, minlength=len(keys)).tolist()
+        gross = np.bincount(groups, weights=np.abs(values), minlength=len(keys)).tolist()
+        return {key: {'net': net[i], 'gross': gross[i]} for i, key in enumerate(keys.tolist())}
+
+    def evaluate(self, holdings: list, columns: dict, benchmark: str, confidence: float) -> dict:
+        """
+        Returns covariance, one day parametric and historical VaR, betas and exposures of the holdings.
+        holdings are PortfolioItems, columns the columnar daily bars of every held symbol and of the benchmark.
+        Values are in each contract's own currency, the currency exposure shows how much of the total that mixes.
+        """
+        holdings = sorted(holdings, key=lambda item: item.contract.symbol)
+        symbols = [item.contract.symbol for item in holdings]
+        key = (
+            tuple((item.contract.conId, item.position) for item in holdings),
+            tuple((symbol, str(columns[symbol]['date'][-1]), float(columns[symbol]['close'][-1])) for symbol in sorted(columns)),
+            benchmark,
+            confidence,
+        )
+        with self.lock:
+            cached = self.results.get((benchmark, confidence))
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+        frame = align({symbol: columns[symbol] for symbol in {*symbols, benchmark}}, fields=('close',))
+        rows = [frame['symbols'].index(symbol) for symbol in symbols]
+        closes = frame['close'][rows]
+        benchmark_closes = frame['close'][frame['symbols'].index(benchmark)]
+
+        # Daily returns over the dates every holding and the benchmark traded on
+        returns = closes[:, 1:] / closes[:, :-1] - 1
+        benchmark_returns = benchmark_closes[1:] / benchmark_closes[:-1] - 1
+        complete = np.isfinite(returns).all(axis=0) & np.isfinite(benchmark_returns)
+        returns = returns[:, complete]
+        benchmark_returns = benchmark_returns[complete]
+        if returns.shape[1] < 2:
+            raise Exception("Not enough overlapping history to compute risk.")
+
+        multipliers = np.array([float(item.contract.multiplier or 1) for item in holdings])
+        positions = np.array([float(item.position) for item in holdings])
+        last = np.array([columns[symbol]['close'][-1] for symbol in symbols])
+        values = positions * multipliers * last
+        # Weights are taken on gross value, so a hedged book does not divide by a net of zero
+        weights = values / np.abs(values).sum()
+
+        covariance = np.atleast_2d(np.cov(returns))
+        volatility = float(np.sqrt(values @ covariance @ values))
+        pnl = values @ returns
+        z = NormalDist().inv_cdf(confidence)
+
+        centered = returns - returns.mean(axis=1, keepdims=True)
+        benchmark_centered = benchmark_returns - benchmark_returns.mean()
+        betas = centered @ benchmark_centered / (benchmark_centered @ benchmark_centered)
+
+        result = {
+            'symbols': symbols,
+            'observations': int(returns.shape[1]),
+            'value': float(values.sum()),
+            'weights': dict(zip(symbols, weights.tolist())),
+            'covariance': covariance,
+            'volatility': volatility,
+            'var': {
+                'confidence': confidence,
+                'parametric': z * volatility,
+                'historical': float(-np.quantile(pnl, 1 - confidence)),
+            },
+            'beta': {
+                'benchmark': benchmark,
+                'portfolio': float(weights @ betas),
+                'assets': dict(zip(symbols, betas.tolist())),
+            },
+            'exposure': {
+                'sector': self._exposure(self._sectors([item.contract for item in holdings]), values),
+                'currency': self._exposure([item.contract.currency for item in holdings], values),
+            },
+        }
+        with self.lock:
+            self.results[(benchmark, confidence)] = (key, result)
+        logger.info(f"Recomputed risk for {len(symbols)} holdings over {returns.shape[1]} days")
+        return result
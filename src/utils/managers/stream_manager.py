@@ -0,0 +1,107 @@
+from ib_insync import IB, Ticker
+from src.utils.managers.subscription_manager import SubscriptionManager
+from src.utils.logger import logger
+from typing import Callable
+import itertools
+import threading
+import math
+import time
+
+# Fastest update rate a single client can ask for
+_MIN_INTERVAL = 0.1
+
+# Comment line sent when nothing changed so proxies keep the stream open
+_KEEP_ALIVE_SECONDS = 15
+
+class StreamManager:
+
+    def __init__(self, ib: IB, subscriptions: SubscriptionManager, wait: Callable[[float], None]):
+        """
+        Fans out market data to streaming clients.
+        Every symbol has a single IB subscription no matter how many clients follow it,
+        and each client gets the latest quote per symbol coalesced over its own interval.
+        Ticks arrive on the IB event loop while clients read from request threads, so pending quotes are swapped under a lock.
+        """
+        self.ib = ib
+        self.subscriptions = subscriptions
+        self.wait = wait
+        self.lock = threading.Lock()
+        self.clients = {}
+        self.followers = {}
+        self.ids = itertools.count(1)
+        self.ib.pendingTickersEvent += self._on_tickers
+
+    def _quote(self, ticker: Ticker) -> dict:
+        quote = {
+            'symbol': ticker.contract.symbol,
+            'last': ticker.last,
+            'bid': ticker.bid,
+            'ask': ticker.ask,
+            'bidSize': ticker.bidSize,
+            'askSize': ticker.askSize
+        }
+        for key, value in quote.items():
+            if isinstance(value, float) and math.isnan(value):
+                quote[key] = None
+        return quote
+
+    def _on_tickers(self, tickers: set):
+        for ticker in tickers:
+            client_ids = self.followers.get(ticker.contract.symbol)
+            if not client_ids:
+                continue
+            quote = self._quote(ticker)
+            with self.lock:
+                for client_id in client_ids:
+                    self.clients[client_id]['pending'][quote['symbol']] = quote
+
+    def open(self, contracts: list) -> int:
+        """Registers a client for the given contracts and returns its id."""
+        client_id = next(self.ids)
+        client = {'contracts': [], 'pending': {}}
+        self.clients[client_id] = client
+        try:
+            for contract in contracts:
+                ticker = self.subscriptions.acquire(contract)
+                client['contracts'].append(contract)
+                self.followers.setdefault(contract.symbol, set()).add(client_id)
+                if not math.isnan(ticker.last):
+                    client['pending'][contract.symbol] = self._quote(ticker)
+        except Exception:
+            self.close(client_id)
+            raise
+        logger.info(f"Stream client {client_id} following {[contract.symbol for contract in contracts]}")
+        return client_id
+
+    def close(self, client_id: int):
+        with self.lock:
+            client = self.clients.pop(client_id, None)
+        if client is None:
+            return
+        for contract in client['contracts']:
+            self.subscriptions.release(contract)
+            followers = self.followers.get(contract.symbol, set())
+            followers.discard(client_id)
+            if not followers:
+                self.followers.pop(contract.symbol, None)
+        logger.info(f"Stream client {client_id} closed")
+
+    def updates(self, client_id: int, interval: float):
+        """
+        Yields the quotes that changed since the previous batch, at most once per interval.
+        Yields None when nothing changed for a while so the caller can keep the connection alive.
+        """
+        interval = max(interval, _MIN_INTERVAL)
+        client = self.clients[client_id]
+        idle_since = time.time()
+        while True:
+            self.wait(interval)
+            with self.lock:
+                quotes = list(client['pending'].values())
+                client['pending'] = {}
+            if quotes:
+                idle_since = time.time()
+                yield quotes
+            elif time.time() - idle_since > _KEEP_ALIVE_SECONDS:
+                idle_since = time.time()
+                yield None
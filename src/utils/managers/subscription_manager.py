@@ -0,0 +1,101 @@
+from ib_insync import IB, Contract, Ticker
+from src.utils.logger import logger
+from collections import OrderedDict
+import asyncio
+import math
+import time
+
+# Unreferenced subscriptions are cancelled after this many idle seconds
+_IDLE_SECONDS = 300
+
+# Stay below the account's market data line allowance (100 by default)
+_MAX_LINES = 90
+
+# Generic ticks requested for every subscription (233 = RTVolume)
+_GENERIC_TICKS = '233'
+
+class SubscriptionManager:
+
+    def __init__(self, ib: IB):
+        """
+        Keeps long-lived market data subscriptions so repeated quote requests reuse the same Ticker.
+        Subscriptions are reference counted by streaming clients, and the ones nobody holds
+        are cancelled when idle for too long or when the market data line cap is reached (LRU first).
+        """
+        self.ib = ib
+        self.subscriptions = OrderedDict()
+        self.market_data_type_set = False
+
+    def _key(self, contract: Contract) -> tuple:
+        return (contract.secType, contract.symbol, contract.exchange, contract.currency)
+
+    def _cancel(self, key: tuple):
+        subscription = self.subscriptions.pop(key)
+        try:
+            self.ib.cancelMktData(subscription['contract'])
+        except Exception as e:
+            logger.error(f"Error cancelling market data for {key}: {str(e)}")
+        logger.info(f"Cancelled market data subscription for {key}")
+
+    def _evict(self):
+        now = time.time()
+        for key, subscription in list(self.subscriptions.items()):
+            if subscription['refs'] == 0 and now - subscription['used'] > _IDLE_SECONDS:
+                self._cancel(key)
+
+        if len(self.subscriptions) < _MAX_LINES:
+            return
+
+        for key, subscription in list(self.subscriptions.items()):
+            if subscription['refs'] == 0:
+                self._cancel(key)
+                return
+        raise Exception(f"All {_MAX_LINES} market data lines are in use.")
+
+    def get(self, contract: Contract) -> Ticker:
+        """Returns the ticker for the contract, subscribing to it when needed."""
+        key = self._key(contract)
+        subscription = self.subscriptions.get(key)
+        if subscription is None:
+            self._evict()
+            if not self.market_data_type_set:
+                self.ib.reqMarketDataType(3)
+                self.market_data_type_set = True
+            logger.info(f"Subscribing to market data for {key}")
+            ticker = self.ib.reqMktData(contract, _GENERIC_TICKS, False, False, [])
+            subscription = {'contract': contract, 'ticker': ticker, 'refs': 0, 'used': 0.0}
+            self.subscriptions[key] = subscription
+
+        subscription['used'] = time.time()
+        self.subscriptions.move_to_end(key)
+        return subscription['ticker']
+
+    def acquire(self, contract: Contract) -> Ticker:
+        """Returns the ticker and holds the subscription until released."""
+        ticker = self.get(contract)
+        self.subscriptions[self._key(contract)]['refs'] += 1
+        return ticker
+
+    def release(self, contract: Contract):
+        subscription = self.subscriptions.get(self._key(contract))
+        if subscription is None:
+            return
+        subscription['refs'] = max(subscription['refs'] - 1, 0)
+        subscription['used'] = time.time()
+
+    def restore(self):
+        """Re-requests every subscription after a reconnect, the gateway forgets them when the session drops."""
+        self.market_data_type_set = False
+        for key, subscription in self.subscriptions.items():
+            if not self.market_data_type_set:
+                self.ib.reqMarketDataType(3)
+                self.market_data_type_set = True
+            subscription['ticker'] = self.ib.reqMktData(subscription['contract'], _GENERIC_TICKS, False, False, [])
+        logger.info(f"Restored {len(self.subscriptions)} market data subscriptions")
+
+    async def wait_for_last(self, ticker: Ticker, timeout: float):
+        """Waits for the first last price on a fresh subscription without polling."""
+        async def _wait():
+            while math.isnan(ticker.last):
+                await ticker.updateEvent
+        await asyncio.wait_for(_wait(), timeout)